@@ -1,7 +1,14 @@
 # 전략 패턴, 옵저버 패턴, 전략 패턴 적용됨
+import argparse
 import tkinter as tk
-from tkinter import ttk
 import abc
+from report_cache import ReportRows
+from screen_pool import ScreenPool
+from session_flow import SessionView, open_flow, FLUSH_INTERVAL_MS
+from report_worker import ReportWorker
+from stats_view import VirtualStatsView, ALL_PERIODS
+from trend_window import TREND_WINDOWS, TREND_REFRESH_MS
+from metrics import Metrics
 
 class ChoiceStrategy(abc.ABC):
     @abc.abstractmethod
@@ -39,159 +46,181 @@ class ChoiceBuilder:
     def build(self):
         return Choice(self.option1, self.option2)
 
-class DataCollector:
-    def __init__(self, choices):
-        self.choices = choices
-        self.demographics = {
-            "1학년": {"total": 0, "responses": [[] for _ in range(len(self.choices))]},
-            "2학년": {"total": 0, "responses": [[] for _ in range(len(self.choices))]},
-            "3학년": {"total": 0, "responses": [[] for _ in range(len(self.choices))]},
-            "4학년": {"total": 0, "responses": [[] for _ in range(len(self.choices))]},
-            "남자": {"total": 0, "responses": [[] for _ in range(len(self.choices))]},
-            "여자": {"total": 0, "responses": [[] for _ in range(len(self.choices))]}
-        }
-
-    def update_statistics(self, grade, gender, responses):
-        self.demographics[grade]["total"] += 1
-        self.demographics[gender]["total"] += 1
-        
-        for i, response in enumerate(responses):
-            self.demographics[grade]["responses"][i].append(response)
-            self.demographics[gender]["responses"][i].append(response)
-
-class BalanceGame:
-    def __init__(self, root):
+class BalanceGame(SessionView): # 설문 흐름은 SessionFlow가 맡고, 이 클래스는 Tk 화면만 그린다.
+    def __init__(self, root, db_path=None, metrics_path=None, significance=False):
         self.root = root
         self.root.title("밸런스 게임")
         
-        self.choices = [
-            ChoiceBuilder().set_option1("성적 C+ 7개(재수강 가능)").set_option2("성적 B0 7개").build(),
-            ChoiceBuilder().set_option1("학교 70년 다니기").set_option2("70년대 외대 다니기").build(),
-            ChoiceBuilder().set_option1("교수님과 70시간 면담").set_option2("70시간 도서관 공부").build(),
-            ChoiceBuilder().set_option1("전공 70학점 듣기").set_option2("교양 70학점 듣기").build(),
-            ChoiceBuilder().set_option1("시간표 70% 1교시").set_option2("시간표 70% 9교시").build(),
-            ChoiceBuilder().set_option1("학식 70번 먹기").set_option2("70번 연속 굶기").build()
-        ]
+        self.shared_db = db_path is not None
+        self.flow = open_flow(self, db_path)
+        self.report_rows = ReportRows(self.flow.collector)
+        self.significance_report = None
+        if significance: # NumPy가 필요하므로 켤 때만 불러온다.
+            from significance import SignificanceReport
+            self.significance_report = SignificanceReport(self.flow.collector, self.question_name)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.screen_pool = ScreenPool(self.root, tk.Frame)
+        self.screen_pool.register("question", self.build_question_screen)
+        self.screen_pool.register("grade", self.build_grade_screen)
+        self.screen_pool.register("gender", self.build_gender_screen)
+        self.screen_pool.register("statistics", self.build_statistics_screen)
+        self.report_worker = ReportWorker(self.root, self.render_report, self.apply_report)
+        self.report_worker.start()
+        self.refresh_id = None
+        self.flush_id = self.root.after(FLUSH_INTERVAL_MS, self.flush_due)
+        self.metrics = None
+        if metrics_path is not None: # 계측을 켤 때만 메서드를 바꿔 끼우므로 끄면 비용이 없다.
+            self.instrument(metrics_path)
+        self.flow.start_new_session()
+
+    def instrument(self, metrics_path):
+        self.metrics = Metrics(metrics_path)
+        self.metrics.attach(self.root)
+        self.metrics.wrap_until_idle(self, "show_choice", "click_to_next_question")
+        self.metrics.wrap(self.flow, "display_question", "display_question")
+        self.metrics.wrap(self.flow, "update_statistics", "update_statistics")
+        self.metrics.wrap(self, "show_statistics", "show_statistics")
+        self.metrics.wrap(self.flow.collector, "update_statistics", "aggregate")
+        if self.flow.response_log is not None:
+            self.metrics.wrap(self.flow.response_log, "append", "log_append")
+        self.metrics.wrap(self.report_worker, "render", "render_report")
+        self.metrics.wrap(self.report_worker, "apply", "apply_report")
+
+    def build_question_screen(self, frame):
+        self.question_label = tk.Label(frame, font=("Helvetica", 14))
+        self.question_label.pack(pady=20)
         
-        self.responses = []
-        self.data_collector = DataCollector(self.choices)
-        self.start_new_session()
-
-    def start_new_session(self):
-        self.current_question = 0
-        self.responses = []
-        self.display_question()
-
-    def display_question(self):
-        self.clear_widgets()
+        self.option1_button = tk.Button(frame, font=("Helvetica", 12), command=lambda: self.show_choice(1))
+        self.option1_button.pack(side=tk.LEFT, padx=20)
         
-        if self.current_question < len(self.choices):
-            choice = self.choices[self.current_question]
-            self.question_label = tk.Label(self.root, text=f"질문 {self.current_question + 1}:", font=("Helvetica", 14))
-            self.question_label.pack(pady=20)
-            
-            self.option1_button = tk.Button(self.root, text=choice.option1, font=("Helvetica", 12), command=lambda: self.show_choice(1))
-            self.option1_button.pack(side=tk.LEFT, padx=20)
-            
-            self.option2_button = tk.Button(self.root, text=choice.option2, font=("Helvetica", 12), command=lambda: self.show_choice(2))
-            self.option2_button.pack(side=tk.RIGHT, padx=20)
-        else:
-            self.collect_demographics()
+        self.option2_button = tk.Button(frame, font=("Helvetica", 12), command=lambda: self.show_choice(2))
+        self.option2_button.pack(side=tk.RIGHT, padx=20)
+
+    def show_question(self, index, question):
+        choice = ChoiceBuilder().set_option1(question.option1).set_option2(question.option2).build()
+        self.cancel_refresh()
+        self.screen_pool.show("question")
+        self.question_label.config(text=f"질문 {index + 1}:")
+        self.option1_button.config(text=choice.option1)
+        self.option2_button.config(text=choice.option2)
 
     def show_choice(self, choice):
-        self.responses.append(choice)
-        self.current_question += 1
-        self.display_question()
+        self.flow.choose(choice)
 
-    def collect_demographics(self):
-        self.clear_widgets()
-        
-        self.question_label = tk.Label(self.root, text="학년을 선택하세요:", font=("Helvetica", 14))
-        self.question_label.pack(pady=20)
+    def build_grade_screen(self, frame):
+        tk.Label(frame, text="학년을 선택하세요:", font=("Helvetica", 14)).pack(pady=20)
         
         self.grade_var = tk.StringVar(value="1학년")
         grades = ["1학년", "2학년", "3학년", "4학년"]
         for grade in grades:
-            tk.Radiobutton(self.root, text=grade, variable=self.grade_var, value=grade).pack(anchor=tk.W)
+            tk.Radiobutton(frame, text=grade, variable=self.grade_var, value=grade).pack(anchor=tk.W)
         
-        self.next_button = tk.Button(self.root, text="다음", command=self.collect_gender)
+        self.next_button = tk.Button(frame, text="다음", command=self.flow.collect_gender)
         self.next_button.pack(pady=20)
 
-    def collect_gender(self):
-        self.clear_widgets()
-        
-        self.question_label = tk.Label(self.root, text="성별을 선택하세요:", font=("Helvetica", 14))
-        self.question_label.pack(pady=20)
+    def ask_grade(self):
+        self.screen_pool.show("grade")
+        self.grade_var.set("1학년")
+
+    def build_gender_screen(self, frame):
+        tk.Label(frame, text="성별을 선택하세요:", font=("Helvetica", 14)).pack(pady=20)
         
         self.gender_var = tk.StringVar(value="남자")
         genders = ["남자", "여자"]
         for gender in genders:
-            tk.Radiobutton(self.root, text=gender, variable=self.gender_var, value=gender).pack(anchor=tk.W)
+            tk.Radiobutton(frame, text=gender, variable=self.gender_var, value=gender).pack(anchor=tk.W)
         
-        self.submit_button = tk.Button(self.root, text="제출", command=self.update_statistics)
+        self.submit_button = tk.Button(frame, text="제출", command=self.submit)
         self.submit_button.pack(pady=20)
 
-    def update_statistics(self):
-        grade = self.grade_var.get()
-        gender = self.gender_var.get()
-        
-        self.data_collector.update_statistics(grade, gender, self.responses)
-        self.show_statistics()
+    def ask_gender(self):
+        self.screen_pool.show("gender")
+        self.gender_var.set("남자")
 
-    def show_statistics(self):
-        self.clear_widgets()
-        
-        canvas = tk.Canvas(self.root)
-        scrollbar = ttk.Scrollbar(self.root, orient="vertical", command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas)
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(
-                scrollregion=canvas.bbox("all")
-            )
-        )
-
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        total_participants = sum([self.data_collector.demographics[grade]["total"] for grade in ["1학년", "2학년", "3학년", "4학년"]])
-        result_text = f"총 참여 인수: {total_participants}\n\n"
+    def submit(self):
+        self.flow.update_statistics(self.grade_var.get(), self.gender_var.get())
+
+    def build_statistics_screen(self, frame):
+        self.total_label = tk.Label(frame, font=("Helvetica", 12))
+        self.total_label.pack(pady=10)
         
-        for grade in ["1학년", "2학년", "3학년", "4학년"]:
-            total = self.data_collector.demographics[grade]["total"]
-            result_text += f"{grade} (총 {total}명):\n"
-            for i, responses in enumerate(self.data_collector.demographics[grade]["responses"]):
-                if total > 0:
-                    percent1 = (responses.count(1) / total) * 100
-                    percent2 = (responses.count(2) / total) * 100
-                    result_text += f"질문 {i + 1}: 선택 1 - {percent1:.2f}%, 선택 2 - {percent2:.2f}%\n"
-            result_text += "\n"
+        self.new_session_button = tk.Button(frame, text="새로운 사용자 시작", command=self.flow.start_new_session)
+        self.new_session_button.pack(side=tk.BOTTOM, pady=20)
         
-        for gender in ["남자", "여자"]:
-            total = self.data_collector.demographics[gender]["total"]
-            result_text += f"{gender} (총 {total}명):\n"
-            for i, responses in enumerate(self.data_collector.demographics[gender]["responses"]):
-                if total > 0:
-                    percent1 = (responses.count(1) / total) * 100
-                    percent2 = (responses.count(2) / total) * 100
-                    result_text += f"질문 {i + 1}: 선택 1 - {percent1:.2f}%, 선택 2 - {percent2:.2f}%\n"
-            result_text += "\n"
-
-        result_label = tk.Label(scrollable_frame, text=result_text, font=("Helvetica", 12), justify=tk.LEFT)
-        result_label.pack(pady=20)
+        self.correlation_label = tk.Label(frame, font=("Courier", 10), justify=tk.LEFT)
+        self.correlation_label.pack(side=tk.BOTTOM)
         
-        self.new_session_button = tk.Button(scrollable_frame, text="새로운 사용자 시작", command=self.start_new_session)
-        self.new_session_button.pack(pady=20)
+        self.significance_label = tk.Label(frame, font=("Courier", 10), justify=tk.LEFT)
+        self.significance_label.pack(side=tk.BOTTOM)
         
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        periods = [ALL_PERIODS] + list(TREND_WINDOWS) if self.flow.trend is not None else None
+        segments = self.report_rows.segments + (self.flow.cube.joint_segments() if self.flow.cube is not None else [])
+        self.stats_view = VirtualStatsView(frame, segments, self.question_name, periods) # 보이는 행만 그리는 통계 표
+        self.stats_view.pack(fill=tk.BOTH, expand=True)
 
-    def clear_widgets(self):
-        for widget in self.root.winfo_children():
-            widget.pack_forget()
+    def show_statistics(self):
+        self.screen_pool.show("statistics")
+        self.report_worker.request()
+        self.schedule_refresh()
+
+    def schedule_refresh(self): # 새 제출이 없어도 최근 구간에서 지난 버킷이 빠지고 다른 키오스크의 기록이 보이도록 주기적으로 다시 만든다.
+        if (self.flow.trend is not None or self.shared_db) and self.refresh_id is None:
+            self.refresh_id = self.root.after(TREND_REFRESH_MS, self.refresh_statistics)
+
+    def refresh_statistics(self):
+        self.refresh_id = None
+        if self.screen_pool.current == "statistics":
+            self.report_worker.request()
+            self.schedule_refresh()
+
+    def flush_due(self): # 마지막 제출 뒤 화면이 가만히 있어도 남은 기록을 디스크로 내린다.
+        self.flush_id = self.root.after(FLUSH_INTERVAL_MS, self.flush_due)
+        self.flow.flush_due()
+
+    def cancel_refresh(self):
+        if self.refresh_id is not None:
+            self.root.after_cancel(self.refresh_id)
+            self.refresh_id = None
+
+    def render_report(self): # 작업 스레드에서 호출
+        pattern_index = self.flow.pattern_index
+        correlation = ""
+        if pattern_index is not None and pattern_index.dense: # 질문이 많으면 상관계수 표가 화면보다 커지므로 생략
+            correlation = pattern_index.render_correlation()
+        rows = {ALL_PERIODS: self.report_rows.rows()}
+        if self.flow.cube is not None:
+            rows[ALL_PERIODS] = rows[ALL_PERIODS] + self.flow.cube.joint_rows()
+        if self.flow.trend is not None:
+            for name, seconds in TREND_WINDOWS.items():
+                rows[name] = self.flow.trend.rows(seconds)
+        significance = self.significance_report.render() if self.significance_report is not None else ""
+        return self.flow.collector.total_participants(), rows, correlation, significance
+
+    def apply_report(self, report): # 메인 스레드에서 호출
+        total, rows, correlation, significance = report
+        self.total_label.config(text=f"총 참여 인수: {total}")
+        self.stats_view.set_period_rows(rows)
+        self.correlation_label.config(text=correlation)
+        self.significance_label.config(text=significance)
+
+    def question_name(self, i):
+        return f"질문 {i + 1}"
+
+    def close(self):
+        self.cancel_refresh()
+        self.root.after_cancel(self.flush_id)
+        self.report_worker.stop()
+        if self.metrics is not None:
+            self.metrics.dump()
+        self.flow.close()
+        self.root.destroy()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", help="여러 키오스크가 함께 쓰는 SQLite 파일 경로")
+    parser.add_argument("--metrics", help="계측 결과를 주기적으로 내보낼 파일 경로 (.prom이면 Prometheus 형식, 그 밖에는 JSON)")
+    parser.add_argument("--significance", action="store_true", help="통계 화면에 학년/성별에 따라 갈리는 질문의 검정 결과를 표시 (NumPy 필요)")
+    args = parser.parse_args()
     root = tk.Tk()
-    app = BalanceGame(root)
+    app = BalanceGame(root, args.db, args.metrics, args.significance)
     root.mainloop()
@@ -1,185 +1,249 @@
 # 팩토리 패턴, 전략 패턴, 커맨드 패턴 적용됨
+import argparse # 명령행 옵션(--db) 처리
 import tkinter as tk # 파이썬에서 기본적으로 제공하는 GUI 라이브러리 윈도우 창, 버튼, 레이블 등 댜양한 GUI 요소를 만들 수 있게 해줍니다.
-from tkinter import ttk # tkinter의 테마가 적용된 위젯을 제공하는 서브 모듈입니다. 'ttk'를 사용하면 좀 더 현대적이고 스타일이 적용된 GUI 요소를 사용할 수 있습니다.
+from report_cache import ReportRows # 버전이 바뀐 세그먼트의 통계 행만 다시 만드는 캐시
+from screen_pool import ScreenPool # 화면별 위젯을 재사용하는 풀
+from command_history import CommandHistory # 최근 N개 명령만 보관하는 실행 기록
+from session_flow import SessionView, open_flow, FLUSH_INTERVAL_MS # 화면과 분리된 설문 흐름 엔진과 화면 인터페이스
+from report_worker import ReportWorker # 통계 텍스트를 작업 스레드에서 만드는 작업자
+from stats_view import VirtualStatsView, ALL_PERIODS # 보이는 행만 그리는 통계 표
+from trend_window import TREND_WINDOWS, TREND_REFRESH_MS # 최근 구간 추세 (최근 10분, 최근 1시간)
+from metrics import Metrics # 단계별 소요 시간과 이벤트 루프 지연 계측
+from event_log import EventStore, DEFAULT_EVENT_LOG_PATH # 실행된 명령과 제출을 기록하는 이벤트 로그
 
 class ChoiceStrategy: # 전략 패턴 추상 클래스 : 게임의 선택 방식을 구현하고, 사용자 입력에 따라 동작을 변경하는 방법을 보여줍니다.
+    # 전략 객체는 상태를 갖지 않으므로 모든 게임과 명령이 하나의 인스턴스를 공유한다. (플라이웨이트)
     def make_choice(self, game_instance): # 선택지 구현 메소드
         pass
 
+    def undo_choice(self, game_instance): # 마지막 선택을 되돌리는 메소드
+        return game_instance.undo() # 흐름 엔진이 마지막 응답을 지우고 이전 선택지를 다시 표시한다. 되돌릴 선택이 없으면 False
+
 class Option1_Strategy(ChoiceStrategy): # ChoiceStrategy 상속, 구체 클래스
+    option = 1 # 이벤트 로그에 기록되는 선택지 번호
+
     def make_choice(self, game_instance):
-        game_instance.responses.append(1)  # responses 리스트에 1을 추가한다.
-        game_instance.current_question += 1 # 선택지 인덱스 1 증가시킨다.
-        game_instance.display_question() # 선택지를 표시한다.
+        game_instance.choose(1) # 흐름 엔진이 응답 1을 기록하고 다음 선택지를 표시한다.
 
 class Option2_Strategy(ChoiceStrategy):
+    option = 2
+
     def make_choice(self, game_instance):
-        game_instance.responses.append(2) # responses 리스트에 2를 추가한다.
-        game_instance.current_question += 1 # 선택지 인덱스 1 증가시킨다.
-        game_instance.display_question() # 선택지를 표시한다.
+        game_instance.choose(2) # 흐름 엔진이 응답 2를 기록하고 다음 선택지를 표시한다.
 
 class StrategyFactory: #팩토리 패턴 : 전략 패턴의 객체 를 생성해준다.
+    strategies = {1: Option1_Strategy(), 2: Option2_Strategy()} # 선택지 번호 -> 공유 전략 객체, 매번 새로 만들지 않는다.
+
     def create_strategy(self, choice):
-        if choice == 1:
-            return Option1_Strategy() # 첫번째 선택지를 선택하면 Option1_Strategy 객체 생성
-        elif choice == 2:
-            return Option2_Strategy() # 두번째 선택지를 선택하면 Option2_Strategy 객체 생성
+        return self.strategies[choice] # 첫번째 선택지는 Option1_Strategy, 두번째 선택지는 Option2_Strategy 공유 객체 반환
 
 class ChoiceCommand: # 커맨드 패턴 : 전략패턴의 선택지를 만드는 명령을 객체로 캡슐화 해준다.
-    def __init__(self, game_instance, strategy):
+    def __init__(self, game_instance, strategy, events=None):
         self.game_instance = game_instance 
         self.strategy = strategy
+        self.events = events # 실행/취소를 기록할 이벤트 로그, None이면 기록하지 않는다.
     
     def execute(self): # 캡슐화한 명령을 실행하는 메서드, 실행하면 각 선택지에 대응되는 make_choice 메서드가 실행된다.
         self.strategy.make_choice(self.game_instance) 
+        if self.events is not None:
+            self.events.choice(self.strategy.option) # 다시 실행(redo)도 같은 선택 이벤트로 기록된다.
+
+    def undo(self): # 실행했던 선택을 되돌린다.
+        if self.strategy.undo_choice(self.game_instance) and self.events is not None: # 실제로 되돌린 경우에만 기록한다.
+            self.events.undo()
 
-class BalanceGame: #밸런스 게임 클래스
-    def __init__(self, root):
+class BalanceGame(SessionView): #밸런스 게임 클래스, 설문 흐름은 SessionFlow가 맡고 이 클래스는 Tk 화면만 그린다.
+    def __init__(self, root, db_path=None, metrics_path=None, significance=False):
         self.root = root # 윈도우 생성
         self.root.title("밸런스 게임") # 윈도우 제목
-        self.questions = [ # 질문 목록
-            ("성적 C+ 7개(재수강 가능)", "성적 B0 7개"),
-            ("학교 70년 다니기", "70년대 외대 다니기"),
-            ("교수님과 70시간 면담", "70시간 도서관 공부"),
-            ("전공 70학점 듣기", "교양 70학점 듣기"),
-            ("시간표 70% 1교시", "시간표 70% 9교시"),
-            ("학식 70번 먹기", "70번 연속 굶기")
-        ]
-        self.responses = [] # 사용자 응답을 저장하는 리스트이다.
-        self.choice_commands = [] # 커맨드 패턴의 명령 객체를 저장하는 리스트이다.
-        self.statics = { # 학년과 성별에 따른 통계를 저장하는 딕셔너리이다.
-            "1학년": {"total": 0, "responses": [[] for _ in range(len(self.questions))]},
-            "2학년": {"total": 0, "responses": [[] for _ in range(len(self.questions))]},
-            "3학년": {"total": 0, "responses": [[] for _ in range(len(self.questions))]},
-            "4학년": {"total": 0, "responses": [[] for _ in range(len(self.questions))]},
-            "남자": {"total": 0, "responses": [[] for _ in range(len(self.questions))]},
-            "여자": {"total": 0, "responses": [[] for _ in range(len(self.questions))]}
-        }
+        self.shared_db = db_path is not None # 다른 키오스크와 함께 쓰는 SQLite면 통계 화면을 주기적으로 다시 읽는다.
+        self.flow = open_flow(self, db_path) # 질문 은행, 집계기, 로그/스냅샷(또는 공유 SQLite)을 연결한 흐름 엔진, 화면 이벤트는 이 객체로 알려준다.
+        self.events = EventStore(DEFAULT_EVENT_LOG_PATH, self.flow.question_ids) # 명령과 제출을 시간순으로 기록, 오래된 이벤트는 백그라운드에서 체크포인트로 접힌다.
+        strategy_factory = StrategyFactory() # 전략 팩토리 객체 생성
+        self.choice_command1 = ChoiceCommand(self.flow, strategy_factory.create_strategy(1), self.events) # 각 선택지에 대한 ChoiceCommand 객체를 한 번만 생성해 재사용, 전략은 흐름 엔진의 응답을 바꾼다.
+        self.choice_command2 = ChoiceCommand(self.flow, strategy_factory.create_strategy(2), self.events)
+        self.choice_commands = CommandHistory(len(self.flow.question_ids)) # 실행된 명령 객체를 최근 질문 수만큼만 저장하는 링 버퍼이다.
+        self.report_rows = ReportRows(self.flow.collector) # 통계 화면 행 캐시
+        self.significance_report = None # 학년/성별에 따라 갈리는 질문의 검정 요약, 켰을 때만 만든다.
+        if significance: # NumPy가 필요하므로 켤 때만 불러온다.
+            from significance import SignificanceReport
+            self.significance_report = SignificanceReport(self.flow.collector, self.question_name)
+        self.root.protocol("WM_DELETE_WINDOW", self.close) # 창을 닫을 때 로그를 디스크에 내리고 닫음
+        self.screen_pool = ScreenPool(self.root, tk.Frame) # 화면별 위젯을 한 번만 만들고 재사용하는 풀
+        self.screen_pool.register("question", self.build_question_screen)
+        self.screen_pool.register("grade", self.build_grade_screen)
+        self.screen_pool.register("gender", self.build_gender_screen)
+        self.screen_pool.register("statistics", self.build_statistics_screen)
+        self.report_worker = ReportWorker(self.root, self.render_report, self.apply_report) # 통계 계산은 작업 스레드에서, 화면 반영은 프레임마다 최대 한 번
+        self.report_worker.start()
+        self.refresh_id = None # 통계 화면의 주기 갱신 예약 id
+        self.flush_id = self.root.after(FLUSH_INTERVAL_MS, self.flush_due) # 제출이 끊겨도 남은 기록을 주기적으로 디스크에 내림
+        self.metrics = None
+        if metrics_path is not None: # 계측을 켤 때만 메서드를 바꿔 끼우므로 끄면 비용이 없다.
+            self.instrument(metrics_path)
         self.start_new_session() # 새로운 세션 시작 메서드
 
+    def instrument(self, metrics_path): # 계측할 단계에 시간을 재는 래퍼를 끼운다.
+        self.metrics = Metrics(metrics_path)
+        self.metrics.attach(self.root) # 이벤트 루프 지연 측정과 주기적 내보내기 시작
+        self.metrics.wrap_until_idle(self.choice_command1, "execute", "click_to_next_question") # 버튼 클릭부터 다음 화면이 그려질 때까지
+        self.metrics.wrap_until_idle(self.choice_command2, "execute", "click_to_next_question")
+        self.metrics.wrap(self.flow, "display_question", "display_question")
+        self.metrics.wrap(self.flow, "update_statistics", "update_statistics")
+        self.metrics.wrap(self, "show_statistics", "show_statistics")
+        self.metrics.wrap(self.flow.collector, "update_statistics", "aggregate")
+        if self.flow.response_log is not None:
+            self.metrics.wrap(self.flow.response_log, "append", "log_append")
+        self.metrics.wrap(self.report_worker, "render", "render_report") # 작업 스레드의 통계 계산
+        self.metrics.wrap(self.report_worker, "apply", "apply_report") # 메인 스레드의 화면 반영
+
     def start_new_session(self): # 새로운 세션 시작
-        self.current_question = 0 # 현재 선택지 인덱스 초기화
-        self.responses = [] # 응답 리스트 초기화
-        self.display_question() # 선택지 표시 메서드 
-
-    def display_question(self): #선택지 표시 메서드
-        #현재 선택지를 표시해준다. 각 선택지는 대응되는 전략을 실행하는 커맨드로 연결된다.
-        self.clear_widgets() # 기존 위젯 삭제
-        if self.current_question < len(self.questions): # 아직 표시할 선택지가 남았는지 확인
-            question = self.questions[self.current_question] # 현재 선택지를 가져옴
-            self.question_label = tk.Label(self.root, text=f"질문 {self.current_question + 1}:", font=("Helvetica", 14)) # 선택지 라벨 생성
-            self.question_label.pack(pady=20) # 라벨 배치
-            
-            strategy_factory = StrategyFactory() # 전략 팩토리 객체 생성
-            cmd1 = ChoiceCommand(self, strategy_factory.create_strategy(1)) # 각 선택지에 대한 ChoiceCommand 객체를 생성 
-            cmd2 = ChoiceCommand(self, strategy_factory.create_strategy(2))
-            
-            self.choice_commands.append(cmd1) # choice_commands 리스트에 명령 객체를 추가합니다.
-            self.choice_commands.append(cmd2) # choice_commands 리스트에 명령 객체를 추가합니다.
-            
-            self.option1_button = tk.Button(self.root, text=question[0], font=("Helvetica", 12), command=cmd1.execute) # 각 선택지에 대한 버튼 생성 후 윈도우에 배치, 클릭 할 때 커맨드 패턴 execute 됨
-            self.option1_button.pack(side=tk.LEFT, padx=20) 
-            
-            self.option2_button = tk.Button(self.root, text=question[1], font=("Helvetica", 12), command=cmd2.execute)
-            self.option2_button.pack(side=tk.RIGHT, padx=20)
-        else: # 더 이상 질문이 없으면 collect_grade 메서드 호출
-            self.collect_grade()
-
-    def collect_grade(self): # 통계 데이터 
-        self.clear_widgets() # 기존 위젯 삭제
-        self.question_label = tk.Label(self.root, text="학년을 선택하세요:", font=("Helvetica", 14)) # 학년 선택 라벨 표시
-        self.question_label.pack(pady=20)
+        self.choice_commands.clear() # 이전 사용자의 명령 기록 초기화
+        self.events.new_session()
+        self.flow.start_new_session() # 선택지 인덱스와 응답 리스트를 초기화하고 첫 선택지를 표시
+
+    def build_question_screen(self, frame): # 선택지 화면 위젯을 한 번만 생성
+        self.question_label = tk.Label(frame, font=("Helvetica", 14)) # 선택지 라벨 생성
+        self.question_label.pack(pady=20) # 라벨 배치
+        
+        self.option1_button = tk.Button(frame, font=("Helvetica", 12), command=lambda: self.choice_commands.execute(self.choice_command1)) # 각 선택지에 대한 버튼 생성 후 배치, 클릭 할 때 커맨드 패턴 execute 됨
+        self.option1_button.pack(side=tk.LEFT, padx=20) 
+        
+        self.option2_button = tk.Button(frame, font=("Helvetica", 12), command=lambda: self.choice_commands.execute(self.choice_command2))
+        self.option2_button.pack(side=tk.RIGHT, padx=20)
+        
+        self.undo_button = tk.Button(frame, text="이전", command=self.choice_commands.undo) # 마지막 선택을 되돌리는 버튼
+        self.undo_button.pack(side=tk.BOTTOM, pady=10)
+        
+        self.redo_button = tk.Button(frame, text="다시", command=self.choice_commands.redo) # 되돌린 선택을 다시 실행하는 버튼
+        self.redo_button.pack(side=tk.BOTTOM)
+
+    def show_question(self, index, question): # 흐름 엔진이 호출, 현재 선택지를 표시해준다. 각 선택지는 대응되는 전략을 실행하는 커맨드로 연결된다.
+        self.cancel_refresh() # 통계 화면을 떠나므로 주기 갱신 중지
+        self.screen_pool.show("question") # 선택지 화면 표시, 위젯은 재사용
+        self.question_label.config(text=f"질문 {index + 1}:") # 라벨 텍스트만 교체
+        self.option1_button.config(text=question.option1) # 버튼 텍스트만 교체, 명령 객체는 재사용
+        self.option2_button.config(text=question.option2)
+
+    def build_grade_screen(self, frame): # 학년 선택 화면 위젯을 한 번만 생성
+        tk.Label(frame, text="학년을 선택하세요:", font=("Helvetica", 14)).pack(pady=20) # 학년 선택 라벨 표시
         
         self.grade_var = tk.StringVar(value="1학년") # 선택된 학년을 저장하는 변수
         grades = ["1학년", "2학년", "3학년", "4학년"]
-        for grade in grades: # 각 학년에 대한 라디오 버튼 생성 후 윈도우에 배치
-            tk.Radiobutton(self.root, text=grade, variable=self.grade_var, value=grade).pack(anchor=tk.W)
+        for grade in grades: # 각 학년에 대한 라디오 버튼 생성 후 배치
+            tk.Radiobutton(frame, text=grade, variable=self.grade_var, value=grade).pack(anchor=tk.W)
         
-        self.next_button = tk.Button(self.root, text="다음", command=self.collect_gender) # 다음 버튼 생성 후 윈도우에 배치
+        self.next_button = tk.Button(frame, text="다음", command=self.flow.collect_gender) # 다음 버튼 생성 후 배치
         self.next_button.pack(pady=20)
 
-    def collect_gender(self):
-        self.clear_widgets() # 기존 위젯 삭제
-        self.question_label = tk.Label(self.root, text="성별을 선택하세요:", font=("Helvetica", 14)) # 성별 선택 라벨 표시
-        self.question_label.pack(pady=20)
+    def ask_grade(self): # 흐름 엔진이 호출, 더 이상 질문이 없으면 학년을 묻는다.
+        self.screen_pool.show("grade") # 학년 선택 화면 표시
+        self.grade_var.set("1학년") # 이전 사용자의 선택을 초기화
+
+    def build_gender_screen(self, frame): # 성별 선택 화면 위젯을 한 번만 생성
+        tk.Label(frame, text="성별을 선택하세요:", font=("Helvetica", 14)).pack(pady=20) # 성별 선택 라벨 표시
         
         self.gender_var = tk.StringVar(value="남자") # 선택된 성별을 저장하는 변수
         genders = ["남자", "여자"]
-        for gender in genders: # 각 성별에 대한 라디오 버튼을 생성하고 윈도우에 배치
-            tk.Radiobutton(self.root, text=gender, variable=self.gender_var, value=gender).pack(anchor=tk.W)
+        for gender in genders: # 각 성별에 대한 라디오 버튼을 생성하고 배치
+            tk.Radiobutton(frame, text=gender, variable=self.gender_var, value=gender).pack(anchor=tk.W)
         
-        self.submit_button = tk.Button(self.root, text="제출", command=self.update_statistics) # 제출 버튼 생성, 데이터를 제출하고 통계를 업데이트
+        self.submit_button = tk.Button(frame, text="제출", command=self.submit) # 제출 버튼 생성, 데이터를 제출하고 통계를 업데이트
         self.submit_button.pack(pady=20)
 
-    def update_statistics(self): 
-        grade = self.grade_var.get() # 선택된 학년과 성별을 가져옴
+    def ask_gender(self): # 흐름 엔진이 호출
+        self.screen_pool.show("gender") # 성별 선택 화면 표시
+        self.gender_var.set("남자") # 이전 사용자의 선택을 초기화
+
+    def submit(self): # 선택된 학년과 성별로 집계, 로그 기록, 통계 표시는 흐름 엔진이 처리
+        grade = self.grade_var.get()
         gender = self.gender_var.get()
-        
-        self.statics[grade]["total"] += 1 # 선택된 학년과 성별의 총 참여자 수를 증가시킵니다.
-        self.statics[gender]["total"] += 1
-        
-        for i, response in enumerate(self.responses): # 각 질문에 대한 응답에 통계에 추가합니다.
-            self.statics[grade]["responses"][i].append(response)
-            self.statics[gender]["responses"][i].append(response)
-        
-        self.show_statistics() # 'show_statistics' 메서드를 호출하여 통계를 표시
+        self.events.submit(grade, gender) # 제출 이벤트 기록
+        self.flow.update_statistics(grade, gender)
 
-    def show_statistics(self):
-        self.clear_widgets() # 기존 위젯 삭제
-        
-        canvas = tk.Canvas(self.root) # 통계를 표시할 스크롤 가능한 캔버스와 프레임을 설정
-        scrollbar = ttk.Scrollbar(self.root, orient="vertical", command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas)
+    def build_statistics_screen(self, frame): # 통계 화면 위젯을 한 번만 생성
+        self.total_label = tk.Label(frame, font=("Helvetica", 12)) # 총 참여 인원 라벨
+        self.total_label.pack(pady=10)
         
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(
-                scrollregion=canvas.bbox("all")
-            )
-        )
-
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        total_participants = sum([self.statics[grade]["total"] for grade in ["1학년", "2학년", "3학년", "4학년"]]) # 총 참여자 수
-        result_text = f"총 참여 인수: {total_participants}\n\n" 
+        self.new_session_button = tk.Button(frame, text="새로운 사용자 시작", command=self.start_new_session) # 새로운 세션을 시작하는 버튼 생성 후 아래에 배치
+        self.new_session_button.pack(side=tk.BOTTOM, pady=20)
         
-        for grade in ["1학년", "2학년", "3학년", "4학년"]: # 학년 별 통계 정보를 result_text 에 추가
-            total = self.statics[grade]["total"]
-            result_text += f"{grade} (총 {total}명):\n"
-            for i, responses in enumerate(self.statics[grade]["responses"]): # 각 질문에 대한 선택 비율을 계산하여 result_text에 추가
-                if total > 0:
-                    percent1 = (responses.count(1) / total) * 100 # 응답 비율 표시
-                    percent2 = (responses.count(2) / total) * 100 # 응답 비율 표시
-                    question_text = self.questions[i] # 현재 질문을 가져옴
-                    result_text += f"{question_text[0]} vs {question_text[1]}:\n 선택 1 - {percent1:.2f}%, 선택 2 - {percent2:.2f}%\n"
-            result_text += "\n"
+        self.correlation_label = tk.Label(frame, font=("Courier", 10), justify=tk.LEFT) # 질문 간 상관계수 표
+        self.correlation_label.pack(side=tk.BOTTOM)
         
-        for gender in ["남자", "여자"]: # 성별별 통계 정보를 'result_text'에 추가
-            total = self.statics[gender]["total"]
-            result_text += f"{gender} (총 {total}명):\n"
-            for i, responses in enumerate(self.statics[gender]["responses"]): # 각 질문에 대한 선택 비율을 계산하여 result_text에 추가
-                if total > 0:
-                    percent1 = (responses.count(1) / total) * 100 # 응답 비율 표시
-                    percent2 = (responses.count(2) / total) * 100 # 응답 비율 표시
-                    question_text = self.questions[i] # 현재 질문을 가져옴
-                    result_text += f"{question_text[0]} vs {question_text[1]}:\n 선택 1 - {percent1:.2f}%, 선택 2 - {percent2:.2f}%\n"
-            result_text += "\n"
-
-        result_label = tk.Label(scrollable_frame, text=result_text, font=("Helvetica", 12), justify=tk.LEFT) # 결과 텍스트를 표시하는 라벨을 생성, 스크롤 가능
-        result_label.pack(pady=20)
+        self.significance_label = tk.Label(frame, font=("Courier", 10), justify=tk.LEFT) # 유의성 검정 요약 (--significance)
+        self.significance_label.pack(side=tk.BOTTOM)
         
-        self.new_session_button = tk.Button(scrollable_frame, text="새로운 사용자 시작", command=self.start_new_session) # 새로운 세션을 시작하는 버튼 생성, 스크롤 가능
-        self.new_session_button.pack(pady=20)
-        
-        canvas.pack(side="left", fill="both", expand=True) #캔버스와 스크롤 바 윈도우 배치
-        scrollbar.pack(side="right", fill="y")
-    
-    def clear_widgets(self): # 윈도우에 있는 모든 위젯을 숨김
-        for widget in self.root.winfo_children():
-            widget.pack_forget()
+        periods = [ALL_PERIODS] + list(TREND_WINDOWS) if self.flow.trend is not None else None # 최근 구간 추세를 셀 때만 기간 선택 표시
+        segments = self.report_rows.segments + (self.flow.cube.joint_segments() if self.flow.cube is not None else []) # 학년, 성별, 학년 x 성별 조합
+        self.stats_view = VirtualStatsView(frame, segments, self.question_name, periods) # 보이는 행만 그리는 통계 표, 기간/세그먼트 필터, 질문 검색, 정렬 지원
+        self.stats_view.pack(fill=tk.BOTH, expand=True)
+
+    def show_statistics(self): # 흐름 엔진이 제출을 집계한 뒤 호출
+        self.screen_pool.show("statistics") # 통계 화면 표시
+        self.report_worker.request() # 텍스트는 작업 스레드가 만들고, 준비되면 apply_report로 반영된다.
+        self.schedule_refresh() # 화면을 보는 동안 추세 구간이 시간에 따라 갱신되도록 예약
+
+    def schedule_refresh(self): # 새 제출이 없어도 최근 구간에서 지난 버킷이 빠지고 다른 키오스크의 기록이 보이도록 주기적으로 다시 만든다.
+        if (self.flow.trend is not None or self.shared_db) and self.refresh_id is None:
+            self.refresh_id = self.root.after(TREND_REFRESH_MS, self.refresh_statistics)
+
+    def refresh_statistics(self): # 통계 화면이 아직 보이면 다시 요청하고 다음 갱신을 예약
+        self.refresh_id = None
+        if self.screen_pool.current == "statistics":
+            self.report_worker.request()
+            self.schedule_refresh()
+
+    def flush_due(self): # 마지막 제출 뒤 화면이 가만히 있어도 fsync되지 않은 기록을 디스크로 내리고 다음 차례를 예약
+        self.flush_id = self.root.after(FLUSH_INTERVAL_MS, self.flush_due) # 기록이 실패해도 다음 차례는 예약해 둔다.
+        self.flow.flush_due()
+
+    def cancel_refresh(self): # 통계 화면을 떠나거나 창을 닫을 때 예약한 갱신을 취소
+        if self.refresh_id is not None:
+            self.root.after_cancel(self.refresh_id)
+            self.refresh_id = None
+
+    def render_report(self): # 작업 스레드에서 호출, 통계 화면에 필요한 값을 만든다.
+        pattern_index = self.flow.pattern_index
+        correlation = ""
+        if pattern_index is not None and pattern_index.dense: # 질문이 많으면 상관계수 표가 화면보다 커지므로 생략
+            correlation = pattern_index.render_correlation() # 질문 간 상관계수 표
+        rows = {ALL_PERIODS: self.report_rows.rows()} # 바뀐 세그먼트의 행만 다시 만들고 나머지는 캐시를 재사용
+        if self.flow.cube is not None:
+            rows[ALL_PERIODS] = rows[ALL_PERIODS] + self.flow.cube.joint_rows() # "3학년 여자" 같은 조합 세그먼트 행
+        if self.flow.trend is not None:
+            for name, seconds in TREND_WINDOWS.items(): # 구간마다 걸친 버킷만 더함
+                rows[name] = self.flow.trend.rows(seconds)
+        significance = self.significance_report.render() if self.significance_report is not None else "" # 질문 x 요인 검정을 한 번에 계산
+        return self.flow.collector.total_participants(), rows, correlation, significance
+
+    def apply_report(self, report): # 메인 스레드에서 호출, 만들어진 값을 위젯에 반영한다.
+        total, rows, correlation, significance = report
+        self.total_label.config(text=f"총 참여 인수: {total}")
+        self.stats_view.set_period_rows(rows) # 보이는 행만 다시 그림
+        self.correlation_label.config(text=correlation)
+        self.significance_label.config(text=significance)
+
+    def question_name(self, i): # 통계 표에 표시할 질문 이름
+        question = self.flow.question_bank.get(self.flow.question_ids[i]) # 질문 은행에서 가져옴
+        return f"{question.option1} vs {question.option2}"
+
+    def close(self): # 남은 로그를 디스크에 내리고 윈도우를 닫음
+        self.cancel_refresh()
+        self.root.after_cancel(self.flush_id) # 닫는 중인 로그에 fsync를 예약하지 않게 함
+        self.report_worker.stop() # 작업 스레드를 먼저 멈춰 닫는 중인 집계기를 읽지 않게 함
+        if self.metrics is not None:
+            self.metrics.dump() # 마지막 계측 결과를 내보냄
+        self.flow.close() # 로그를 닫고 스냅샷 저장 (SQLite면 남은 제출을 기록하고 연결을 닫음)
+        self.events.close() # 진행 중인 압축을 기다리고 이벤트 로그를 디스크에 내림
+        self.root.destroy()
 
 if __name__ == "__main__": # 메인 Tkinter 윈도우 생성
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", help="여러 키오스크가 함께 쓰는 SQLite 파일 경로")
+    parser.add_argument("--metrics", help="계측 결과를 주기적으로 내보낼 파일 경로 (.prom이면 Prometheus 형식, 그 밖에는 JSON)")
+    parser.add_argument("--significance", action="store_true", help="통계 화면에 학년/성별에 따라 갈리는 질문의 검정 결과를 표시 (NumPy 필요)")
+    args = parser.parse_args()
     root = tk.Tk() 
-    app = BalanceGame(root) # balanceGame 클래스 객체화하여 게임 시작
+    app = BalanceGame(root, args.db, args.metrics, args.significance) # balanceGame 클래스 객체화하여 게임 시작
     root.mainloop() #Tkinter 메인 루프를 시작하여 실행
\ No newline at end of file
@@ -0,0 +1,214 @@
+# 비동기 제출 서버 : 여러 키오스크(또는 웹 프런트엔드)의 제출을 asyncio 서버 하나로 모아 CountingDataCollector로 집계한다.
+#
+# 프로토콜 : 한 줄에 JSON 하나 (UTF-8, 줄바꿈으로 구분)
+#   {"op": "submit", "grade": "3학년", "gender": "여자", "responses": [1, 2, 1, 1, 2, 2]}  -> {"ok": true}
+#   {"op": "stats"}  -> {"ok": true, "total_participants": ..., "segments": {"1학년": {"total": ..., "percent": [[선택1, 선택2], ...]}, ...}}
+# 제출은 큐에 모았다가 묶음(micro-batch)으로 집계하고, 집계가 끝난 뒤에 응답한다.
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from data_collector import CountingDataCollector, GRADES, GENDERS
+from question_bank import shared_bank
+from response_log import ResponseLog
+
+
+class BalanceServer:
+    def __init__(self, question_ids=None, batch_size=512, batch_delay=0.002, response_log=None):
+        self.collector = CountingDataCollector(shared_bank().ids() if question_ids is None else question_ids)
+        self.batch_size = batch_size # 한 번에 집계할 최대 제출 수
+        self.batch_delay = batch_delay # 첫 제출이 도착한 뒤 묶음을 모으는 시간(초)
+        self.response_log = response_log # 지정하면 묶음마다 로그에 기록하고 한 번 fsync한다.
+        self.queue = None
+        self.server = None
+        self.batcher = None
+        self.stats_version = None
+        self.stats_cache = None
+
+    def validate(self, message):
+        grade = message.get("grade")
+        gender = message.get("gender")
+        responses = message.get("responses")
+        if grade not in GRADES or gender not in GENDERS:
+            raise ValueError("Unknown grade or gender")
+        if not isinstance(responses, list) or len(responses) > self.collector.n_questions:
+            raise ValueError("Invalid responses")
+        if any(type(response) is not int or response not in (1, 2) for response in responses): # 1.0, True 같은 값은 배열 색인으로 쓸 수 없다.
+            raise ValueError("Unknown option")
+        return grade, gender, responses
+
+    async def start(self, host="127.0.0.1", port=8765):
+        self.queue = asyncio.Queue()
+        self.batcher = asyncio.create_task(self.batch_loop())
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        return self.server
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.batcher is not None:
+            self.batcher.cancel()
+            try:
+                await self.batcher
+            except asyncio.CancelledError:
+                pass
+        if self.response_log is not None:
+            self.response_log.close()
+
+    async def batch_loop(self): # 큐에 모인 제출을 묶음으로 집계한다. 제출 하나가 실패해도 루프는 계속 돈다.
+        while True:
+            batch = [await self.queue.get()]
+            if self.batch_delay:
+                await asyncio.sleep(self.batch_delay)
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                self.aggregate(batch)
+            except Exception as error: # 예상하지 못한 오류도 대기 중인 제출에 돌려주고 다음 묶음을 처리한다.
+                for _, _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+
+    def aggregate(self, batch): # 로그에 먼저 기록하고 집계한다. 기록하지 못한 제출은 집계에 넣지 않는다.
+        accepted = []
+        for grade, gender, responses, future in batch:
+            try:
+                if self.response_log is not None:
+                    self.response_log.append(grade, gender, responses)
+                self.collector.update_statistics(grade, gender, responses)
+            except (OSError, ValueError) as error:
+                if not future.done():
+                    future.set_exception(error)
+                continue
+            accepted.append(future)
+        if self.response_log is not None:
+            try:
+                self.response_log.sync()
+            except OSError as error: # 디스크에 내리지 못했으면 성공으로 응답하지 않는다.
+                for future in accepted:
+                    if not future.done():
+                        future.set_exception(error)
+                return
+        for future in accepted:
+            if not future.done():
+                future.set_result(True)
+
+    def statistics(self): # 집계가 바뀌었을 때만 응답 내용을 다시 만든다.
+        if self.stats_version != self.collector.version:
+            collector = self.collector
+            segments = {}
+            for segment in collector.segments:
+                segments[segment] = {
+                    "total": collector.total(segment),
+                    "percent": [[collector.percent(segment, i, option) for option in range(1, collector.n_options + 1)]
+                                for i in range(collector.n_questions)],
+                }
+            self.stats_cache = {"ok": True, "total_participants": collector.total_participants(), "segments": segments}
+            self.stats_version = collector.version
+        return self.stats_cache
+
+    async def handle_message(self, message):
+        op = message.get("op")
+        if op == "submit":
+            grade, gender, responses = self.validate(message)
+            future = asyncio.get_running_loop().create_future()
+            await self.queue.put((grade, gender, responses, future))
+            try:
+                await future
+            except Exception as error: # 기록/집계 실패는 연결을 끊지 않고 오류로 응답한다.
+                return {"ok": False, "error": str(error)}
+            return {"ok": True}
+        if op == "stats":
+            return self.statistics()
+        raise ValueError("Unknown op")
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = await self.handle_message(json.loads(line))
+                except (ValueError, AttributeError) as error: # JSON 오류(JSONDecodeError)도 ValueError이다.
+                    reply = {"ok": False, "error": str(error)}
+                writer.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+# 부하 시뮬레이션 : localhost에서 가상 키오스크 여러 개가 동시에 접속해 제출하고 통계를 조회한다.
+async def simulate_client(host, port, submissions, rng, n_questions):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(submissions):
+            message = {"op": "submit", "grade": rng.choice(GRADES), "gender": rng.choice(GENDERS),
+                       "responses": [rng.choice((1, 2)) for _ in range(n_questions)]}
+            writer.write(json.dumps(message).encode("utf-8") + b"\n")
+            await writer.drain()
+            reply = json.loads(await reader.readline())
+            if not reply["ok"]:
+                raise RuntimeError(reply["error"])
+        writer.write(b'{"op": "stats"}\n')
+        await writer.drain()
+        return json.loads(await reader.readline())
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def simulate(clients, submissions, seed=None, host="127.0.0.1", port=0):
+    server = BalanceServer()
+    listener = await server.start(host, port)
+    port = listener.sockets[0].getsockname()[1]
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(simulate_client(host, port, submissions, random.Random(rng.random()), server.collector.n_questions) for _ in range(clients)))
+    finally:
+        elapsed = time.perf_counter() - start
+        await server.stop()
+    return server, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="밸런스 게임 제출 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--log", help="제출을 기록할 응답 로그 경로")
+    parser.add_argument("--simulate", type=int, metavar="CLIENTS", help="서버를 띄우고 가상 클라이언트 CLIENTS개로 부하를 겁니다.")
+    parser.add_argument("--submissions", type=int, default=10, help="가상 클라이언트당 제출 수")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.simulate:
+        server, elapsed = asyncio.run(simulate(args.simulate, args.submissions, args.seed, args.host))
+        total = server.collector.total_participants()
+        print(f"{total} submissions from {args.simulate} clients in {elapsed:.2f}s ({total / elapsed:,.0f} submissions/s)")
+        return
+
+    async def serve():
+        response_log = None
+        server = BalanceServer()
+        if args.log:
+            response_log = ResponseLog(args.log, sync_every=1 << 30, sync_interval=float("inf")) # fsync는 묶음마다 직접 한다.
+            response_log.replay(server.collector)
+            server.response_log = response_log
+        listener = await server.start(args.host, args.port)
+        try:
+            async with listener:
+                await listener.serve_forever()
+        finally:
+            await server.stop()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
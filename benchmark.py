@@ -0,0 +1,291 @@
+# 벤치마크 : 네 가지 구현(원본, balanceGUI 1, balanceGUI 2, project1)의 제출 경로와 리포트 생성 경로를 같은 데이터로 측정한다.
+# 참여자 수별 처리량(명/초), 리포트 생성 시간, 최대 메모리를 JSON으로 출력해 커밋 간 비교에 쓴다.
+# 리포트 시간은 모든 구현이 원본 통계 화면과 같은 텍스트를 만드는 시간이다.
+#
+# 사용 예 : python benchmark.py --sizes 1000,100000,1000000 --output bench.json
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from array import array
+
+from data_collector import CountingDataCollector, GRADES, GENDERS
+from question_bank import shared_bank
+from session_flow import HeadlessView, SessionFlow
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+QUESTION_BANK = shared_bank()
+QUESTIONS = [(question.option1, question.option2) for question in QUESTION_BANK.questions()]
+PATTERN_BYTES = (len(QUESTIONS) + 7) // 8 # 제출 하나의 응답 비트 크기
+PROJECT1_GENDERS = {"남자": "Male", "여자": "Female"}
+PROJECT1_GRADES = {"1학년": "Freshman", "2학년": "Sophomore", "3학년": "Junior", "4학년": "Senior"}
+
+
+def responses_of(patterns, index): # 응답 비트(i번째 비트가 1이면 선택 2) -> 응답 리스트
+    bits = int.from_bytes(patterns[index * PATTERN_BYTES:(index + 1) * PATTERN_BYTES], "little")
+    return [2 if bits >> i & 1 else 1 for i in range(len(QUESTIONS))]
+
+
+def format_report(total_participants, segments): # 원본 show_statistics와 같은 텍스트, segments는 (세그먼트, 인원, [(선택 1 비율, 선택 2 비율)])
+    lines = [f"총 참여 인수: {total_participants}\n\n"]
+    for segment, total, percents in segments:
+        lines.append(f"{segment} (총 {total}명):\n")
+        for i, (percent1, percent2) in enumerate(percents):
+            lines.append(f"질문 {i + 1}: 선택 1 - {percent1:.2f}%, 선택 2 - {percent2:.2f}%\n")
+        lines.append("\n")
+    return "".join(lines)
+
+
+def format_rows(collector, rows): # ReportRows의 행을 원본 텍스트로 만든다. 행이 없는 세그먼트는 인원만 쓴다.
+    percents = {}
+    for segment, _, _, percent1, percent2 in rows:
+        percents.setdefault(segment, []).append((percent1, percent2))
+    segments = [(segment, collector.total(segment), percents.get(segment, [])) for segment in GRADES + GENDERS]
+    return format_report(collector.total_participants(), segments)
+
+
+def load_module(filename): # 파일 이름에 공백이 있는 GUI 스크립트를 모듈로 불러온다.
+    name = filename.replace(" ", "_").replace(".py", "")
+    spec = importlib.util.spec_from_file_location(name, os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Selected: # tk.StringVar 대신 고정된 선택 값을 돌려준다.
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class OriginalVariant: # balanceGUI original.py : 응답을 리스트에 쌓고 list.count로 비율을 계산
+    name = "original"
+
+    def __init__(self):
+        module = load_module("balanceGUI original.py")
+        self.game = module.BalanceGame.__new__(module.BalanceGame) # Tk 창 없이 상태만 준비
+        self.game.questions = QUESTIONS
+        self.game.demographics = {
+            segment: {"total": 0, "responses": [[] for _ in range(len(QUESTIONS))]} for segment in GRADES + GENDERS
+        }
+        self.game.display_question = lambda: None # 화면 갱신만 끄고 나머지 흐름은 원본 메서드를 쓴다.
+        self.game.show_statistics = lambda: None
+
+    def submit(self, grade, gender, responses):
+        self.game.current_question = 0
+        self.game.responses = []
+        for response in responses:
+            self.game.show_choice(response)
+        self.game.grade_var = Selected(grade)
+        self.game.gender_var = Selected(gender)
+        self.game.update_statistics()
+
+    def report(self): # 원본 show_statistics의 텍스트 생성 부분은 위젯 코드 안에 있어 같은 알고리즘을 그대로 옮겼다.
+        demographics = self.game.demographics
+        total_participants = sum([demographics[grade]["total"] for grade in GRADES])
+        result_text = f"총 참여 인수: {total_participants}\n\n"
+        for segment in GRADES + GENDERS:
+            total = demographics[segment]["total"]
+            result_text += f"{segment} (총 {total}명):\n"
+            for i, responses in enumerate(demographics[segment]["responses"]):
+                if total > 0:
+                    percent1 = (responses.count(1) / total) * 100
+                    percent2 = (responses.count(2) / total) * 100
+                    result_text += f"질문 {i + 1}: 선택 1 - {percent1:.2f}%, 선택 2 - {percent2:.2f}%\n"
+            result_text += "\n"
+        return result_text
+
+
+class Gui1Variant: # balanceGUI 1.py : SessionFlow + CountingDataCollector + ReportRows (화면 대신 HeadlessView)
+    name = "gui1"
+
+    def __init__(self):
+        module = load_module("balanceGUI 1.py")
+        self.game = module.BalanceGame.__new__(module.BalanceGame) # Tk 창 없이 흐름 엔진만 연결
+        self.game.flow = SessionFlow(HeadlessView(), CountingDataCollector(QUESTION_BANK.ids()), QUESTION_BANK)
+        self.report_rows = module.ReportRows(self.game.flow.collector)
+
+    def submit(self, grade, gender, responses):
+        flow = self.game.flow
+        flow.start_new_session()
+        for response in responses:
+            self.game.show_choice(response)
+        flow.update_statistics(grade, gender)
+
+    def report(self): # 화면은 행 중 보이는 부분만 그리지만, 구현 간 비교를 위해 전체 텍스트를 만든다.
+        return format_rows(self.game.flow.collector, self.report_rows.rows())
+
+
+class Gui2Variant: # balanceGUI 2.py : SessionFlow + StrategyFactory + ChoiceCommand + CommandHistory
+    name = "gui2"
+
+    def __init__(self):
+        module = load_module("balanceGUI 2.py")
+        self.flow = SessionFlow(HeadlessView(), CountingDataCollector(QUESTION_BANK.ids()), QUESTION_BANK)
+        self.report_rows = module.ReportRows(self.flow.collector)
+        self.choice_commands = module.CommandHistory(len(QUESTIONS))
+        strategy_factory = module.StrategyFactory()
+        self.commands = {
+            1: module.ChoiceCommand(self.flow, strategy_factory.create_strategy(1)),
+            2: module.ChoiceCommand(self.flow, strategy_factory.create_strategy(2)),
+        }
+
+    def submit(self, grade, gender, responses):
+        self.choice_commands.clear()
+        self.flow.start_new_session()
+        for response in responses:
+            self.choice_commands.execute(self.commands[response])
+        self.flow.update_statistics(grade, gender)
+
+    def report(self):
+        return format_rows(self.flow.collector, self.report_rows.rows())
+
+
+class Project1Variant: # project1.py : QuestionFactory + Student + Statistics (묶음 단위 집계)
+    name = "project1"
+    batch_size = 10000
+
+    def __init__(self):
+        import project1
+        self.project1 = project1
+        self.stats = project1.Statistics()
+        self.question_ids = QUESTION_BANK.ids()
+        self.batch = []
+
+    def submit(self, grade, gender, responses):
+        project1 = self.project1
+        student = project1.Student(project1.StudentStrategyFactory.create_strategy(PROJECT1_GENDERS[gender], PROJECT1_GRADES[grade]))
+        for question_id, response in zip(self.question_ids, responses):
+            student.make_choice(question_id, str(response))
+        self.batch.append(student)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            self.stats.add_choices(self.batch)
+            self.batch = []
+
+    def report(self): # 성별 x 학년 텐서를 세그먼트별로 롤업해 같은 텍스트를 만든다.
+        self.flush()
+        segments = []
+        for segment in GRADES + GENDERS:
+            if segment in PROJECT1_GRADES:
+                counts = self.stats.rollup(grade=PROJECT1_GRADES[segment])
+            else:
+                counts = self.stats.rollup(gender=PROJECT1_GENDERS[segment])
+            total = int(counts[0].sum()) # 모든 학생이 모든 질문에 답하므로 첫 질문의 응답 수가 인원이다.
+            percents = [(count1 / total * 100, count2 / total * 100) for count1, count2 in counts.tolist()] if total else []
+            segments.append((segment, total, percents))
+        return format_report(sum(total for segment, total, _ in segments if segment in PROJECT1_GRADES), segments)
+
+
+VARIANTS = {variant.name: variant for variant in (OriginalVariant, Gui1Variant, Gui2Variant, Project1Variant)}
+
+
+def generate_submissions(count, seed): # (학년 코드, 성별 코드, 응답 비트) 바이트 배열로 데이터를 미리 만든다. 질문 수와 상관없이 제출당 몇 바이트
+    rng = random.Random(seed)
+    grades = array("B", (rng.randrange(len(GRADES)) for _ in range(count)))
+    genders = array("B", (rng.randrange(len(GENDERS)) for _ in range(count)))
+    patterns = b"".join(rng.getrandbits(len(QUESTIONS)).to_bytes(PATTERN_BYTES, "little") for _ in range(count))
+    return grades, genders, patterns
+
+
+def ingest(variant, submissions): # 응답 리스트를 복원하는 비용은 모든 구현에 똑같이 들어간다.
+    grades, genders, patterns = submissions
+    for index, (grade, gender) in enumerate(zip(grades, genders)):
+        variant.submit(GRADES[grade], GENDERS[gender], responses_of(patterns, index))
+    if hasattr(variant, "flush"):
+        variant.flush()
+
+
+def measure(variant_class, submissions, with_memory=True):
+    count = len(submissions[0])
+    gc.collect()
+    variant = variant_class()
+    start = time.perf_counter()
+    ingest(variant, submissions)
+    ingest_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    variant.report()
+    report_seconds = time.perf_counter() - start
+
+    variant.submit(GRADES[0], GENDERS[0], [1] * len(QUESTIONS)) # 한 명이 더 제출된 뒤 다시 그리는 비용
+    start = time.perf_counter()
+    variant.report()
+    report_after_submit_seconds = time.perf_counter() - start
+    del variant
+
+    result = {
+        "variant": variant_class.name,
+        "participants": count,
+        "ingest_seconds": ingest_seconds,
+        "ingest_per_second": count / ingest_seconds if ingest_seconds > 0 else None,
+        "report_ms": report_seconds * 1000,
+        "report_after_submit_ms": report_after_submit_seconds * 1000,
+        "peak_memory_bytes": None,
+    }
+    if with_memory: # 추적 오버헤드가 시간 측정에 섞이지 않도록 메모리는 따로 한 번 더 돌려 잰다.
+        gc.collect()
+        tracemalloc.start()
+        variant = variant_class()
+        ingest(variant, submissions)
+        variant.report()
+        result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del variant
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="통계/화면 흐름 구현 벤치마크")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="참여자 수 목록 (쉼표로 구분)")
+    parser.add_argument("--variants", default=",".join(VARIANTS), help="측정할 구현 (쉼표로 구분)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="최대 메모리 측정을 건너뜁니다.")
+    parser.add_argument("--output", help="결과 JSON 파일 경로 (기본: 표준 출력)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in [int(value) for value in args.sizes.split(",")]:
+        submissions = generate_submissions(size, args.seed)
+        for name in args.variants.split(","):
+            result = measure(VARIANTS[name], submissions, not args.no_memory)
+            print(f"{name:>8} {size:>9}: {result['ingest_per_second']:>12,.0f} /s, report {result['report_ms']:.2f} ms", file=sys.stderr)
+            results.append(result)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# 대량 가져오기 : CSV/JSONL 응답 파일을 제너레이터 파이프라인으로 한 줄씩 읽어 project1의 Statistics에 묶음 단위로 집계한다.
+# 파일 전체를 메모리에 올리지 않으므로 파일 크기와 관계없이 메모리 사용량이 일정하다.
+#
+# CSV : gender,grade,q1,q2,... 열 (q 뒤 숫자는 질문 은행의 id)
+# JSONL : {"gender": "Female", "grade": "Junior", "choices": {"1": "1", "2": "2", ...}} 또는 q1,q2,... 키
+# --keep-students : 다시 분석할 수 있도록 학생 원본을 StudentStore(학생당 몇 바이트)에 함께 보관한다.
+import argparse
+import csv
+import json
+
+from project1 import QuestionFactory, Statistics, Student, StudentStrategyFactory, batched
+from student_store import StudentStore
+
+
+def read_rows(path): # 파일 확장자에 따라 CSV 또는 JSONL 행을 하나씩 돌려준다.
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.endswith(".csv"):
+            yield from csv.DictReader(file)
+        elif path.endswith((".jsonl", ".ndjson")):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise ValueError(f"Unknown file type: {path}")
+
+
+def row_choices(row, question_ids):
+    choices = row.get("choices")
+    for question_id in question_ids:
+        if choices is not None:
+            choice = choices.get(str(question_id))
+        else:
+            choice = row.get(f"q{question_id}")
+        if choice not in (None, ""):
+            yield question_id, str(choice)
+
+
+def to_students(rows, question_ids=None): # 행을 기존 StudentStrategy를 쓰는 Student로 바꾼다.
+    if question_ids is None:
+        question_ids = QuestionFactory.question_ids()
+    for row in rows:
+        student = Student(StudentStrategyFactory.create_strategy(row["gender"], row["grade"]))
+        for question_id, choice in row_choices(row, question_ids):
+            student.make_choice(question_id, choice)
+        yield student
+
+
+def bulk_import(paths, stats=None, batch_size=1000, store=None): # store를 주면 학생을 압축 저장소에도 쌓는다.
+    if stats is None:
+        stats = Statistics()
+    count = 0
+    for path in paths:
+        for batch in batched(to_students(read_rows(path)), batch_size):
+            stats.add_choices(batch)
+            if store is not None:
+                store.add_students(batch)
+            count += len(batch)
+    return stats, count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CSV/JSONL 응답 파일을 Statistics로 가져옵니다.")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--keep-students", action="store_true", help="학생 원본을 압축 저장소에 보관하고 --gender/--grade 조건으로 다시 셉니다.")
+    parser.add_argument("--gender", help="--keep-students와 함께 : 이 성별만 다시 셉니다. (예: Female)")
+    parser.add_argument("--grade", help="--keep-students와 함께 : 이 학년만 다시 셉니다. (예: Junior)")
+    args = parser.parse_args(argv)
+
+    store = StudentStore() if args.keep_students else None
+    stats, count = bulk_import(args.paths, batch_size=args.batch_size, store=store)
+    print(f"Imported {count} students")
+    stats.display_statistics()
+    if store is not None:
+        print(f"Kept {len(store)} students in {store.nbytes} bytes")
+        counts = store.counts(args.gender, args.grade) # 학생을 하나씩 돌지 않고 비트 연산으로 센다.
+        print(f"Counts for {args.gender or 'all genders'}, {args.grade or 'all grades'}:")
+        for question_id, (count1, count2) in zip(store.question_ids, counts.tolist()):
+            print(f"  Question {question_id}: '1' {count1}, '2' {count2}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# 컬럼형 통계 엔진 : 응답 개수를 [성별, 학년, 질문, 선택지] 4차원 정수 텐서 하나에 저장하고,
+# 합계/비율/롤업(전체 남학생, 전체 4학년, 전체 등)은 NumPy 축 합계로 한 번에 계산한다.
+import json
+
+import numpy as np
+
+GENDERS = ["Male", "Female"]
+GRADES = ["Freshman", "Sophomore", "Junior", "Senior"]
+
+
+class ColumnarStatistics:
+    def __init__(self, question_ids=range(1, 7), choices=("1", "2")):
+        self.gender_index = {gender: i for i, gender in enumerate(GENDERS)}
+        self.grade_index = {grade: i for i, grade in enumerate(GRADES)}
+        self.question_ids = list(question_ids)
+        self.question_index = {question_id: i for i, question_id in enumerate(self.question_ids)}
+        self.choices = list(choices)
+        self.choice_index = {choice: i for i, choice in enumerate(self.choices)}
+        self.counts = np.zeros((len(GENDERS), len(GRADES), len(self.question_ids), len(self.choices)), dtype=np.int64)
+
+    def _grow(self, questions, choices): # 처음 보는 질문이나 선택지가 들어오면 텐서의 마지막 축들을 늘린다.
+        pad_questions = questions - self.counts.shape[2]
+        pad_choices = choices - self.counts.shape[3]
+        if pad_questions > 0 or pad_choices > 0:
+            self.counts = np.pad(self.counts, ((0, 0), (0, 0), (0, max(pad_questions, 0)), (0, max(pad_choices, 0))))
+
+    def question_code(self, question_id):
+        code = self.question_index.get(question_id)
+        if code is None:
+            code = self.question_index[question_id] = len(self.question_ids)
+            self.question_ids.append(question_id)
+            self._grow(len(self.question_ids), len(self.choices))
+        return code
+
+    def choice_code(self, choice):
+        code = self.choice_index.get(choice)
+        if code is None:
+            code = self.choice_index[choice] = len(self.choices)
+            self.choices.append(choice)
+            self._grow(len(self.question_ids), len(self.choices))
+        return code
+
+    def add_codes(self, gender_codes, grade_codes, question_codes, choice_codes):
+        # 코드 배열을 평탄화한 인덱스로 바꿔 bincount 한 번으로 더한다.
+        shape = self.counts.shape
+        flat = np.ravel_multi_index((gender_codes, grade_codes, question_codes, choice_codes), shape)
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(shape)
+
+    def add_students(self, students):
+        genders, grades, questions, choices = [], [], [], []
+        for student in students:
+            gender = self.gender_index[student.gender]
+            grade = self.grade_index[student.grade]
+            for question_id, choice in student.choices.items():
+                genders.append(gender)
+                grades.append(grade)
+                questions.append(self.question_code(question_id))
+                choices.append(self.choice_code(choice))
+        if genders:
+            self.add_codes(genders, grades, questions, choices)
+
+    def rollup(self, gender=None, grade=None): # None인 축은 합쳐서 [질문, 선택지] 개수를 돌려준다.
+        counts = self.counts
+        counts = counts[self.gender_index[gender]] if gender is not None else counts.sum(axis=0)
+        counts = counts[self.grade_index[grade]] if grade is not None else counts.sum(axis=0)
+        return counts
+
+    def marginals(self): # 성별 x 학년별 응답 수 [성별, 학년, 질문]
+        return self.counts.sum(axis=3)
+
+    def percentages(self, gender=None, grade=None): # [질문, 선택지] 선택 비율(%), 응답이 없는 질문은 0
+        counts = self.rollup(gender, grade)
+        totals = counts.sum(axis=1, keepdims=True)
+        return np.divide(counts * 100.0, totals, out=np.zeros(counts.shape), where=totals > 0)
+
+    def merge(self, other): # 질문/선택지 목록을 맞춘 뒤 텐서를 더한다.
+        question_codes = [self.question_code(question_id) for question_id in other.question_ids]
+        choice_codes = [self.choice_code(choice) for choice in other.choices]
+        index = np.ix_(range(len(GENDERS)), range(len(GRADES)), question_codes, choice_codes)
+        self.counts[index] += other.counts
+        return self
+
+    def to_bytes(self): # 헤더 길이(4바이트) + JSON 헤더(질문 id, 선택지) + int64 텐서
+        header = json.dumps({"question_ids": self.question_ids, "choices": self.choices}).encode("utf-8")
+        return len(header).to_bytes(4, "little") + header + self.counts.astype("<i8").tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        size = int.from_bytes(data[:4], "little")
+        header = json.loads(data[4:4 + size].decode("utf-8"))
+        table = cls(header["question_ids"], header["choices"])
+        table.counts = np.frombuffer(data[4 + size:], dtype="<i8").astype(np.int64).reshape(table.counts.shape)
+        return table
+
+    def to_nested(self): # 예전 Statistics.data와 같은 성별 -> 학년 -> 질문 -> 선택지 -> 개수 딕셔너리
+        data = {}
+        for gender_code, grade_code, question_code, choice_code in zip(*np.nonzero(self.counts)):
+            gender_data = data.setdefault(GENDERS[gender_code], {})
+            question_data = gender_data.setdefault(GRADES[grade_code], {}).setdefault(self.question_ids[question_code], {})
+            question_data[self.choices[choice_code]] = int(self.counts[gender_code, grade_code, question_code, choice_code])
+        return data
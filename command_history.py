@@ -0,0 +1,36 @@
+# 커맨드 패턴 : 실행된 명령을 최근 N개까지만 링 버퍼에 보관하고, 실행 취소(undo)/다시 실행(redo)을 제공한다.
+from collections import deque
+
+
+class CommandHistory:
+    def __init__(self, limit):
+        self.done = deque(maxlen=limit) # 실행된 명령, 가득 차면 가장 오래된 명령부터 버린다.
+        self.undone = deque(maxlen=limit) # 실행 취소된 명령, redo 대상
+
+    def execute(self, command):
+        command.execute()
+        self.done.append(command)
+        self.undone.clear() # 새 명령을 실행하면 redo 기록은 무효가 된다.
+
+    def undo(self):
+        if not self.done:
+            return False
+        command = self.done.pop()
+        command.undo()
+        self.undone.append(command)
+        return True
+
+    def redo(self):
+        if not self.undone:
+            return False
+        command = self.undone.pop()
+        command.execute()
+        self.done.append(command)
+        return True
+
+    def clear(self):
+        self.done.clear()
+        self.undone.clear()
+
+    def __len__(self):
+        return len(self.done)
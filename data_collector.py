@@ -0,0 +1,100 @@
+# 카운팅 집계기 : 응답을 리스트에 계속 쌓지 않고 세그먼트/질문/선택지별 개수만 고정 크기 배열에 저장한다.
+import json
+from array import array
+
+GRADES = ["1학년", "2학년", "3학년", "4학년"]
+GENDERS = ["남자", "여자"]
+SEGMENTS = GRADES + GENDERS
+
+
+class CountingDataCollector:
+    def __init__(self, choices, segments=SEGMENTS, n_options=2):
+        self.choices = choices
+        self.segments = list(segments)
+        self.segment_index = {segment: i for i, segment in enumerate(self.segments)} # 세그먼트 이름 -> 배열 인덱스
+        self.n_questions = len(choices)
+        self.n_options = n_options
+        self.stride = self.n_questions * self.n_options # 세그먼트 하나가 차지하는 칸 수
+        self.totals = array("q", [0]) * len(self.segments) # 세그먼트별 참여 인원
+        self.counts = array("q", [0]) * (len(self.segments) * self.stride) # [세그먼트][질문][선택지] 평탄화 배열
+        self.version = 0 # 전체 집계가 바뀔 때마다 증가하는 버전
+        self.segment_versions = array("q", [0]) * len(self.segments) # 세그먼트별 버전, 리포트 캐시가 변경 여부를 판단할 때 사용
+
+    def validate(self, grade, gender, responses):
+        if grade not in self.segment_index or gender not in self.segment_index:
+            raise ValueError("Unknown segment")
+        if len(responses) > self.n_questions:
+            raise ValueError("Too many responses")
+        for response in responses:
+            if not 1 <= response <= self.n_options:
+                raise ValueError("Unknown option")
+
+    def update_statistics(self, grade, gender, responses): # 기존 DataCollector와 같은 시그니처
+        self.validate(grade, gender, responses)
+        for segment in (grade, gender):
+            index = self.segment_index[segment]
+            self.totals[index] += 1
+            self.segment_versions[index] += 1
+            base = index * self.stride
+            for i, response in enumerate(responses):
+                self.counts[base + i * self.n_options + response - 1] += 1
+        self.version += 1
+
+    def refresh(self): # SQLiteDataCollector와 같은 인터페이스, 메모리 집계기는 항상 최신이다.
+        pass
+
+    def load_counts(self, totals, counts): # 스냅샷에서 읽은 개수로 집계를 통째로 교체한다.
+        if len(totals) != len(self.totals) or len(counts) != len(self.counts):
+            raise ValueError("Snapshot shape mismatch")
+        self.totals = totals
+        self.counts = counts
+        for i in range(len(self.segment_versions)):
+            self.segment_versions[i] += 1
+        self.version += 1
+
+    def merge(self, other): # 다른 프로세스/키오스크에서 모은 집계를 더한다.
+        if self.segments != other.segments or (self.n_questions, self.n_options) != (other.n_questions, other.n_options):
+            raise ValueError("Cannot merge collectors with different shapes")
+        for i, total in enumerate(other.totals):
+            self.totals[i] += total
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        for i in range(len(self.segment_versions)):
+            self.segment_versions[i] += 1
+        self.version += 1
+        return self
+
+    def to_bytes(self): # 헤더 길이(4바이트) + JSON 헤더 + totals + counts
+        header = json.dumps({"segments": self.segments, "n_questions": self.n_questions, "n_options": self.n_options}).encode("utf-8")
+        return len(header).to_bytes(4, "little") + header + self.totals.tobytes() + self.counts.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data, choices=None):
+        size = int.from_bytes(data[:4], "little")
+        header = json.loads(data[4:4 + size].decode("utf-8"))
+        collector = cls(choices if choices is not None else range(header["n_questions"]), header["segments"], header["n_options"])
+        totals = array("q")
+        totals.frombytes(data[4 + size:4 + size + len(collector.totals) * totals.itemsize])
+        counts = array("q")
+        counts.frombytes(data[4 + size + len(totals) * totals.itemsize:])
+        collector.load_counts(totals, counts)
+        return collector
+
+    def segment_version(self, segment):
+        return self.segment_versions[self.segment_index[segment]]
+
+    def total(self, segment): # 세그먼트 참여 인원, O(1)
+        return self.totals[self.segment_index[segment]]
+
+    def count(self, segment, question, option): # question은 0부터, option은 1부터 센다.
+        index = self.segment_index[segment]
+        return self.counts[index * self.stride + question * self.n_options + option - 1]
+
+    def percent(self, segment, question, option): # 선택 비율(%), O(1)
+        total = self.total(segment)
+        if total == 0:
+            return 0.0
+        return self.count(segment, question, option) / total * 100
+
+    def total_participants(self): # 모든 참여자는 학년을 하나씩 고르므로 학년 합계가 전체 인원이다.
+        return sum(self.total(grade) for grade in GRADES if grade in self.segment_index)
@@ -0,0 +1,130 @@
+# OLAP 데이터 큐브 : (학년, 성별, ...) 인구통계 차원과 질문/선택지를 함께 묶어 집계한다.
+# 삽입할 때 모든 롤업 조합(예: 3학년 전체, 여자 전체, 전체)의 칸을 함께 증가시켜, 어떤 슬라이스든 O(1)로 조회한다.
+# 설문 흐름(SessionFlow)이 제출마다 갱신하고, 통계 화면은 joint_rows()로 "3학년 여자" 같은 조합 세그먼트 행을 받는다.
+import json
+from array import array
+from itertools import product
+
+from data_collector import GRADES, GENDERS
+
+DEFAULT_DIMENSIONS = (("grade", GRADES), ("gender", GENDERS))
+
+
+class DataCube:
+    def __init__(self, choices, dimensions=DEFAULT_DIMENSIONS, n_options=2):
+        self.choices = choices
+        self.n_questions = len(choices)
+        self.n_options = n_options
+        self.dimension_names = [name for name, _ in dimensions]
+        self.dimension_values = [list(values) for _, values in dimensions]
+        self.value_codes = [{value: i for i, value in enumerate(values)} for values in self.dimension_values]
+        # 차원마다 값 개수 + 1칸을 두고, 마지막 칸을 "전체"(롤업)로 쓴다.
+        self.sizes = [len(values) + 1 for values in self.dimension_values]
+        self.cell_size = 1 + self.n_questions * self.n_options # [참여 인원, 질문별 선택지 개수...]
+        self.strides = []
+        stride = self.cell_size
+        for size in reversed(self.sizes):
+            self.strides.append(stride)
+            stride *= size
+        self.strides.reverse()
+        self.cells = array("q", [0]) * stride
+        self.masks = range(1 << len(self.sizes)) # 각 비트가 켜진 차원은 "전체"로 롤업한다.
+        self.version = 0
+        self.rows_version = None
+        self.rows_cache = []
+
+    def _base(self, codes):
+        return sum(code * stride for code, stride in zip(codes, self.strides))
+
+    def insert(self, values, responses): # values는 차원 순서대로의 값 (예: ("3학년", "여자"))
+        if len(responses) > self.n_questions:
+            raise ValueError("Too many responses")
+        codes = [self.value_codes[i][value] for i, value in enumerate(values)]
+        offsets = []
+        for i, response in enumerate(responses):
+            if not 1 <= response <= self.n_options:
+                raise ValueError("Unknown option")
+            offsets.append(1 + i * self.n_options + response - 1)
+        for mask in self.masks:
+            base = self._base([self.sizes[i] - 1 if mask >> i & 1 else code for i, code in enumerate(codes)])
+            self.cells[base] += 1
+            for offset in offsets:
+                self.cells[base + offset] += 1
+        self.version += 1
+
+    def update_statistics(self, grade, gender, responses): # DataCollector와 같은 시그니처 (기본 차원일 때)
+        self.insert((grade, gender), responses)
+
+    def load_log(self, response_log, offset=None): # 응답 로그(offset이 있으면 그 뒤)를 읽어 큐브에 더한다. 질문 구성이 달랐던 기록은 건너뛴다.
+        count = 0
+        records = response_log.scan() if offset is None else response_log.scan(offset)
+        for grade, gender, responses, _ in records:
+            if len(responses) <= self.n_questions:
+                self.update_statistics(grade, gender, responses)
+                count += 1
+        return count
+
+    def to_bytes(self): # 헤더 길이(4바이트) + JSON 헤더(차원, 질문 수, 선택지 수) + cells
+        header = json.dumps({"dimensions": [[name, values] for name, values in zip(self.dimension_names, self.dimension_values)],
+                             "n_questions": self.n_questions, "n_options": self.n_options}).encode("utf-8")
+        return len(header).to_bytes(4, "little") + header + self.cells.tobytes()
+
+    def load_bytes(self, data): # to_bytes로 저장한 칸을 불러온다. 차원이나 질문 구성이 다르면 False
+        size = int.from_bytes(data[:4], "little")
+        header = json.loads(data[4:4 + size].decode("utf-8"))
+        dimensions = [[name, values] for name, values in zip(self.dimension_names, self.dimension_values)]
+        if (header["dimensions"], header["n_questions"], header["n_options"]) != (dimensions, self.n_questions, self.n_options):
+            return False
+        cells = array("q")
+        cells.frombytes(data[4 + size:])
+        if len(cells) != len(self.cells):
+            return False
+        self.cells = cells
+        self.version += 1
+        return True
+
+    def _cell(self, filters): # 지정하지 않은 차원은 "전체"로 본다.
+        unknown = set(filters) - set(self.dimension_names)
+        if unknown:
+            raise ValueError(f"Unknown dimension: {', '.join(sorted(unknown))}")
+        codes = []
+        for i, name in enumerate(self.dimension_names):
+            value = filters.get(name)
+            codes.append(self.sizes[i] - 1 if value is None else self.value_codes[i][value])
+        return self._base(codes)
+
+    def total(self, **filters): # 슬라이스 참여 인원, 예: total(grade="3학년", gender="여자")
+        return self.cells[self._cell(filters)]
+
+    def count(self, question, option, **filters): # question은 0부터, option은 1부터 센다.
+        return self.cells[self._cell(filters) + 1 + question * self.n_options + option - 1]
+
+    def percent(self, question, option, **filters):
+        base = self._cell(filters)
+        total = self.cells[base]
+        if total == 0:
+            return 0.0
+        return self.cells[base + 1 + question * self.n_options + option - 1] / total * 100
+
+    def joint_rows(self): # 모든 차원 값 조합(예: "3학년 여자")의 통계 화면 행, 인원이 없는 조합은 뺀다. 큐브가 바뀌었을 때만 다시 만든다.
+        version = self.version # 행을 만들기 전에 읽어, 도중에 들어온 제출은 다음 호출에서 반영한다.
+        if self.rows_version != version:
+            rows = []
+            for codes in product(*[range(len(values)) for values in self.dimension_values]):
+                base = self._base(codes)
+                total = self.cells[base]
+                if total == 0:
+                    continue
+                segment = self.joint_name(codes)
+                for i in range(self.n_questions):
+                    offset = base + 1 + i * self.n_options
+                    rows.append((segment, i, total, self.cells[offset] / total * 100, self.cells[offset + 1] / total * 100))
+            self.rows_cache = rows
+            self.rows_version = version
+        return self.rows_cache
+
+    def joint_name(self, codes):
+        return " ".join(values[code] for values, code in zip(self.dimension_values, codes))
+
+    def joint_segments(self): # 통계 화면 세그먼트 선택 상자에 넣을 조합 이름
+        return [self.joint_name(codes) for codes in product(*[range(len(values)) for values in self.dimension_values])]
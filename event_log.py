@@ -0,0 +1,353 @@
+# 이벤트 소싱 : ChoiceCommand 실행/취소, 세션 시작, 제출을 시간순 이벤트로 기록하고, 이벤트를 접어(fold) 집계 상태를 다시 만든다.
+# 체크포인트(그 시점의 집계 + 진행 중인 세션 응답)를 주기적으로 남겨, 원하는 시각의 상태를 가장 가까운 체크포인트부터만 재생해 구한다.
+# 압축(compaction)은 백그라운드 스레드에서 새 체크포인트를 만들고, 최근 keep_checkpoints개 체크포인트 이전의 이벤트를 파일에서 잘라낸다.
+# 그보다 오래된 체크포인트는 한 시간에 하나씩 남겨, 이벤트가 잘린 과거도 그 시각 직전 체크포인트의 상태로 조회할 수 있다.
+#
+# 이벤트 파일 : 헤더(MAGIC, 기준 시각 ms, 첫 레코드의 논리 위치) + 레코드 반복
+# 레코드 구조 : varint(본문 길이) + 본문 + crc32(4바이트)
+# 본문 구조 : 종류(1바이트) + varint(기준 시각 이후 ms) + 값(선택: 선택지 번호, 제출: 학년 코드 * 성별 수 + 성별 코드)
+# 논리 위치는 앞부분을 잘라내도 바뀌지 않는 위치로, 체크포인트는 이 위치를 가리킨다.
+# 기록(꼬리 정리, 압축 포함)은 잠금 파일을 잡은 프로세스 하나만 한다. 조회(replay)는 파일을 읽기만 하므로 실행 중인 키오스크 옆에서도 안전하다.
+#
+# 사용 예 : python event_log.py --at 2026-10-18T12:00   (그 시각의 집계를 다시 만들어 출력)
+import argparse
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError: # Windows에는 flock이 없다. 열린 파일은 os.replace로 교체할 수 없으므로 압축이 실패할 뿐 기록이 사라지지는 않는다.
+    fcntl = None
+
+from data_collector import CountingDataCollector, GRADES, GENDERS
+from question_bank import shared_bank
+from response_log import encode_varint, decode_varint, CRC_SIZE
+
+DEFAULT_EVENT_LOG_PATH = "balance_events.log"
+MAGIC = b"BGE1"
+HEADER = struct.Struct("<4sqq") # MAGIC, 기준 시각(ms), 첫 레코드의 논리 위치
+CHECKPOINT = struct.Struct("<qqI") # 마지막으로 반영한 이벤트 시각(ms), 논리 위치, 진행 중인 세션 응답 수
+NEW_SESSION, CHOICE, UNDO, SUBMIT = range(4) # 이벤트 종류
+
+
+class EventState: # 이벤트를 차례로 접어 만든 상태 : 집계 + 진행 중인 세션의 응답
+    def __init__(self, collector, responses=None, time_ms=0, offset=0):
+        self.collector = collector
+        self.responses = list(responses or [])
+        self.time_ms = time_ms # 마지막으로 반영한 이벤트 시각
+        self.offset = offset # 다음에 읽을 이벤트의 논리 위치
+
+    def apply(self, kind, value, grades, genders):
+        if kind == CHOICE:
+            self.responses.append(value)
+        elif kind == UNDO:
+            if self.responses:
+                self.responses.pop()
+        elif kind == NEW_SESSION:
+            self.responses = []
+        elif kind == SUBMIT:
+            self.collector.update_statistics(grades[value // len(genders)], genders[value % len(genders)], self.responses)
+
+
+class EventStore:
+    def __init__(self, path=DEFAULT_EVENT_LOG_PATH, choices=None, grades=GRADES, genders=GENDERS, checkpoint_every=10000, keep_checkpoints=24, archive_every_ms=3600 * 1000):
+        self.path = path
+        self.checkpoint_path = path + ".checkpoints"
+        self.choices = shared_bank().ids() if choices is None else choices
+        self.grades = list(grades)
+        self.genders = list(genders)
+        self.grade_codes = {grade: i for i, grade in enumerate(self.grades)}
+        self.gender_codes = {gender: i for i, gender in enumerate(self.genders)}
+        self.checkpoint_every = checkpoint_every # 이 개수만큼 이벤트가 쌓이면 백그라운드 압축을 시작
+        self.keep_checkpoints = keep_checkpoints # 이벤트 단위로 시간 여행이 가능한 범위 : 최근 체크포인트 몇 개까지 이전 이벤트를 남길지
+        self.archive_every_ms = archive_every_ms # 그보다 오래된 체크포인트는 이 간격마다 하나만 남긴다. (하나에 수백 바이트)
+        self.lock = threading.Lock() # 기록과 파일 교체를 직렬화한다.
+        self.compact_lock = threading.Lock() # 압축은 한 번에 하나만
+        self.compactor = None
+        self.since_checkpoint = 0
+        self.fd = None
+        self.lock_fd = None # 기록하는 동안 배타적으로 잡는 잠금 파일
+        self.base_time = None
+        self.base_offset = 0
+
+    def now_ms(self):
+        return int(time.time() * 1000)
+
+    def read_header(self, buffer):
+        magic, base_time, base_offset = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Unknown event log format")
+        return base_time, base_offset
+
+    def acquire(self): # 다른 프로세스(키오스크나 --compact)가 기록 중이면 파일을 건드리기 전에 멈춘다.
+        if self.lock_fd is not None or fcntl is None:
+            return
+        fd = os.open(self.path + ".lock", os.O_WRONLY | os.O_CREAT, 0o644) # 압축이 교체하지 않는 파일이라 잠금이 교체 뒤에도 유지된다.
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise RuntimeError(f"{self.path} is being written by another process") from None
+        self.lock_fd = fd
+
+    def open(self): # 잠금을 잡고 파일을 열어 잘린 마지막 레코드를 정리한다. 새 파일이면 헤더를 쓴다.
+        if self.fd is not None:
+            return
+        self.acquire()
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= HEADER.size:
+            with open(self.path, "rb") as file:
+                _, base_offset = self.read_header(file.read(HEADER.size))
+            end = base_offset
+            for end, _, _, _ in self.scan(base_offset):
+                pass
+            valid = HEADER.size + end - base_offset
+            if os.path.getsize(self.path) > valid:
+                os.truncate(self.path, valid)
+        else:
+            with open(self.path, "wb") as file:
+                file.write(HEADER.pack(MAGIC, self.now_ms(), 0))
+        with open(self.path, "rb") as file:
+            self.base_time, self.base_offset = self.read_header(file.read(HEADER.size))
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+
+    def append(self, kind, value=0):
+        self.open()
+        body = bytearray((kind,))
+        encode_varint(max(self.now_ms() - self.base_time, 0), body)
+        encode_varint(value, body)
+        record = bytearray()
+        encode_varint(len(body), record)
+        record += body
+        record += zlib.crc32(body).to_bytes(CRC_SIZE, "little")
+        with self.lock:
+            os.write(self.fd, record) # 레코드 하나를 한 번의 write로 기록한다. fsync는 닫을 때만 한다. (제출 자체는 ResponseLog가 보장)
+        self.since_checkpoint += 1
+        if self.since_checkpoint >= self.checkpoint_every:
+            self.since_checkpoint = 0
+            self.compact_in_background()
+
+    def new_session(self):
+        self.append(NEW_SESSION)
+
+    def choice(self, option):
+        self.append(CHOICE, option)
+
+    def undo(self):
+        self.append(UNDO)
+
+    def submit(self, grade, gender):
+        self.append(SUBMIT, self.grade_codes[grade] * len(self.genders) + self.gender_codes[gender])
+
+    def first_offset(self): # 파일에 남은 첫 이벤트의 논리 위치, 파일이 없으면 0
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < HEADER.size:
+            return 0
+        with open(self.path, "rb") as file:
+            return self.read_header(file.read(HEADER.size))[1]
+
+    def scan(self, start=None): # 논리 위치 start부터 (논리 끝 위치, 시각 ms, 종류, 값)을 차례로 돌려준다. 잘린 레코드를 만나면 멈춘다.
+        # 압축이 파일을 교체해도 연 파일의 헤더 기준으로 위치를 바꾸므로 어긋나지 않는다.
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < HEADER.size:
+            return
+        with open(self.path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            base_time, base_offset = self.read_header(buffer)
+            if start is not None and start < base_offset:
+                raise ValueError("Events before the oldest checkpoint have been compacted")
+            offset = HEADER.size if start is None else HEADER.size + start - base_offset
+            size = len(buffer)
+            while offset < size:
+                try:
+                    length, body_start = decode_varint(buffer, offset, size)
+                except EOFError:
+                    return
+                end = body_start + length + CRC_SIZE
+                if end > size:
+                    return
+                body = buffer[body_start:body_start + length]
+                if zlib.crc32(body) != int.from_bytes(buffer[end - CRC_SIZE:end], "little"):
+                    return
+                delta, position = decode_varint(body, 1, length)
+                value, _ = decode_varint(body, position, length)
+                yield base_offset + end - HEADER.size, base_time + delta, body[0], value
+                offset = end
+
+    def load_checkpoints(self): # [(시각 ms, 논리 위치, 진행 중인 세션 응답, 집계 바이트)]
+        checkpoints = []
+        if not os.path.exists(self.checkpoint_path):
+            return checkpoints
+        with open(self.checkpoint_path, "rb") as file:
+            data = file.read()
+        offset = 0
+        while offset < len(data):
+            try:
+                length, start = decode_varint(data, offset, len(data))
+            except EOFError:
+                break
+            end = start + length + CRC_SIZE
+            body = data[start:start + length]
+            if end > len(data) or zlib.crc32(body) != int.from_bytes(data[end - CRC_SIZE:end], "little"):
+                break
+            time_ms, position, count = CHECKPOINT.unpack_from(body)
+            responses = list(body[CHECKPOINT.size:CHECKPOINT.size + count])
+            checkpoints.append((time_ms, position, responses, bytes(body[CHECKPOINT.size + count:])))
+            offset = end
+        return checkpoints
+
+    def encode_checkpoint(self, state):
+        body = CHECKPOINT.pack(state.time_ms, state.offset, len(state.responses)) + bytes(state.responses) + state.collector.to_bytes()
+        record = bytearray()
+        encode_varint(len(body), record)
+        return bytes(record) + body + zlib.crc32(body).to_bytes(CRC_SIZE, "little")
+
+    def replay(self, until=None): # until(초, time.time() 기준) 시점의 상태를 가장 가까운 체크포인트부터 재생해 만든다. None이면 최신 상태
+        # 읽기만 한다. 잘린 꼬리는 scan이 건너뛰므로 정리하지 않는다.
+        # 이벤트가 이미 잘린 과거라면 until 직전 보관 체크포인트의 상태를 그대로 돌려준다. (state.time_ms가 실제 시각)
+        until_ms = None if until is None else int(until * 1000)
+        start = None
+        for checkpoint in self.load_checkpoints():
+            if until_ms is None or checkpoint[0] <= until_ms:
+                start = checkpoint
+        if start is None:
+            if self.first_offset() > 0:
+                raise ValueError("Events before the oldest checkpoint have been compacted")
+            state = EventState(CountingDataCollector(self.choices), offset=0)
+        else:
+            time_ms, offset, responses, data = start
+            state = EventState(CountingDataCollector.from_bytes(data, self.choices), responses, time_ms, offset)
+            if offset < self.first_offset():
+                return state
+        for end, time_ms, kind, value in self.scan(state.offset):
+            if until_ms is not None and time_ms > until_ms:
+                break
+            state.apply(kind, value, self.grades, self.genders)
+            state.time_ms = time_ms
+            state.offset = end
+        return state
+
+    def compact(self): # 최신 상태를 체크포인트로 남기고, 최근 범위 밖의 이벤트를 잘라내고 오래된 체크포인트는 시간 간격으로 솎아 낸다.
+        with self.compact_lock:
+            self.open() # 잠금을 잡아, 다른 프로세스가 기록 중인 파일은 교체하지 않는다.
+            state = self.replay()
+            with open(self.checkpoint_path, "ab") as file:
+                file.write(self.encode_checkpoint(state))
+            checkpoints = self.load_checkpoints()
+            if len(checkpoints) <= self.keep_checkpoints:
+                return state
+            recent = checkpoints[-self.keep_checkpoints:]
+            archived = []
+            for checkpoint in checkpoints[:-self.keep_checkpoints]: # 간격마다 첫 체크포인트만
+                if not archived or checkpoint[0] // self.archive_every_ms != archived[-1][0] // self.archive_every_ms:
+                    archived.append(checkpoint)
+            if len(archived) + len(recent) < len(checkpoints):
+                self.rewrite_checkpoints(archived + recent)
+            self.drop_events(recent[0][1])
+            return state
+
+    def rewrite_checkpoints(self, checkpoints): # 임시 파일에 쓰고 교체한다.
+        temp_path = self.checkpoint_path + ".tmp"
+        with open(temp_path, "wb") as file:
+            for time_ms, offset, responses, data in checkpoints:
+                file.write(self.encode_checkpoint(EventState(CountingDataCollector.from_bytes(data, self.choices), responses, time_ms, offset)))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.checkpoint_path)
+
+    def drop_events(self, cut): # 논리 위치 cut 이전의 이벤트를 지운 새 파일로 교체한다. 기록은 잠시 멈춘다.
+        with self.lock:
+            if cut <= self.base_offset:
+                return
+            temp_path = self.path + ".tmp"
+            with open(self.path, "rb") as source, open(temp_path, "wb") as target:
+                source.seek(HEADER.size + cut - self.base_offset)
+                target.write(HEADER.pack(MAGIC, self.base_time, cut))
+                while True:
+                    chunk = source.read(1 << 20)
+                    if not chunk:
+                        break
+                    target.write(chunk)
+                target.flush()
+                os.fsync(target.fileno())
+            os.close(self.fd)
+            os.replace(temp_path, self.path)
+            self.base_offset = cut
+            self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+
+    def compact_in_background(self):
+        if self.compactor is not None and self.compactor.is_alive():
+            return
+        self.compactor = threading.Thread(target=self.compact, name="event-compactor", daemon=True)
+        self.compactor.start()
+
+    def close(self):
+        if self.compactor is not None:
+            self.compactor.join()
+        if self.fd is not None:
+            os.fsync(self.fd)
+            os.close(self.fd)
+            self.fd = None
+        if self.lock_fd is not None:
+            os.close(self.lock_fd) # 잠금도 함께 풀린다.
+            self.lock_fd = None
+
+
+def benchmark(count, n_questions=6): # 임시 디렉터리에 이벤트 count개를 만들고 전체 재생과 체크포인트 재생 시간을 잰다.
+    with tempfile.TemporaryDirectory() as directory:
+        store = EventStore(os.path.join(directory, "events.log"), range(n_questions), checkpoint_every=1 << 62)
+        per_session = n_questions + 2
+        for i in range(count):
+            step = i % per_session
+            if step == 0:
+                store.new_session()
+            elif step <= n_questions:
+                store.choice(1 + i % 2)
+            else:
+                store.submit(GRADES[i % len(GRADES)], GENDERS[i % len(GENDERS)])
+        start = time.perf_counter()
+        state = store.replay()
+        full = time.perf_counter() - start
+        store.compact()
+        store.new_session()
+        start = time.perf_counter()
+        store.replay()
+        checkpointed = time.perf_counter() - start
+        store.close()
+        size = os.path.getsize(store.path)
+        print(f"{count} events: full replay {full * 1000:.1f} ms ({state.collector.total_participants()} participants), "
+              f"replay from checkpoint {checkpointed * 1000:.2f} ms, log {size} bytes after compaction")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="이벤트 로그로 특정 시각의 집계를 다시 만듭니다.")
+    parser.add_argument("--path", default=DEFAULT_EVENT_LOG_PATH)
+    parser.add_argument("--at", help="이 시각(ISO 8601, 로컬 시간)의 상태를 만듭니다. 생략하면 최신 상태. 압축된 과거는 한 시간 단위 체크포인트로 답합니다.")
+    parser.add_argument("--compact", action="store_true", help="체크포인트를 만들고 오래된 이벤트를 잘라냅니다. 키오스크가 로그를 쓰는 중이면 거부합니다.")
+    parser.add_argument("--benchmark", type=int, metavar="EVENTS", help="임시 로그로 재생 속도를 잽니다.")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return
+    store = EventStore(args.path)
+    if args.compact:
+        try:
+            store.compact()
+        except RuntimeError as error:
+            parser.error(f"--compact: {error}")
+    until = datetime.fromisoformat(args.at).timestamp() if args.at else None
+    start = time.perf_counter()
+    state = store.replay(until)
+    elapsed = time.perf_counter() - start
+    store.close()
+    print(f"state at {datetime.fromtimestamp(state.time_ms / 1000).isoformat()} (replayed in {elapsed * 1000:.1f} ms)")
+    print(f"총 참여 인수: {state.collector.total_participants()}, 진행 중인 세션 응답: {state.responses}")
+    for segment in state.collector.segments:
+        print(f"{segment}: {state.collector.total(segment)}명")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# 계측 : 단계별 소요 시간, 이벤트 개수, Tk 이벤트 루프 지연(멈춤)을 모아 주기적으로 파일에 내보낸다.
+# 계측을 켤 때만 대상 메서드를 시간을 재는 래퍼로 바꿔 끼우므로, 끄면 원래 메서드가 그대로 불려 추가 비용이 없다.
+#
+# 출력 : 경로가 .prom으로 끝나면 Prometheus 텍스트 형식(node_exporter textfile 수집용), 그 밖에는 JSON
+import functools
+import json
+import os
+import threading
+import time
+
+
+class Metrics:
+    def __init__(self, path, dump_interval=10.0, heartbeat_ms=50, stall_ms=100):
+        self.path = path
+        self.dump_interval = dump_interval # 파일로 내보내는 간격(초)
+        self.heartbeat_ms = heartbeat_ms # 이벤트 루프 지연을 재는 간격
+        self.stall_ms = stall_ms # 이보다 늦게 깨어나면 멈춤으로 센다.
+        self.lock = threading.Lock() # 리포트 작업 스레드에서도 기록한다.
+        self.timers = {} # 단계 이름 -> [횟수, 합계(초), 최대(초)]
+        self.counters = {} # 이벤트 이름 -> 개수
+        self.started = time.time()
+        self.root = None
+        self.expected = None # 다음 하트비트가 불려야 하는 시각
+
+    def record(self, name, seconds):
+        with self.lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                self.timers[name] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                if seconds > timer[2]:
+                    timer[2] = seconds
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def wrap(self, owner, attribute, name): # owner.attribute 호출마다 소요 시간을 name 단계로 기록하도록 바꿔 끼운다.
+        function = getattr(owner, attribute)
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start)
+
+        setattr(owner, attribute, timed)
+
+    def wrap_until_idle(self, owner, attribute, name): # 호출부터 그 뒤 화면 갱신까지 끝나 Tk가 한가해질 때까지의 시간을 기록한다.
+        function = getattr(owner, attribute)
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.root.after_idle(lambda: self.record(name, time.perf_counter() - start)) # 이미 예약된 다시 그리기가 먼저 실행된다.
+
+        setattr(owner, attribute, timed)
+
+    def attach(self, root): # 이벤트 루프 지연 측정과 주기적 내보내기를 시작한다.
+        self.root = root
+        self.expected = time.perf_counter() + self.heartbeat_ms / 1000
+        root.after(self.heartbeat_ms, self.heartbeat)
+        root.after(int(self.dump_interval * 1000), self.periodic_dump)
+
+    def heartbeat(self):
+        now = time.perf_counter()
+        lag = max(now - self.expected, 0.0)
+        self.record("event_loop_lag", lag)
+        if lag * 1000 >= self.stall_ms:
+            self.count("event_loop_stalls")
+        self.expected = now + self.heartbeat_ms / 1000
+        self.root.after(self.heartbeat_ms, self.heartbeat)
+
+    def periodic_dump(self):
+        self.dump()
+        self.root.after(int(self.dump_interval * 1000), self.periodic_dump)
+
+    def snapshot(self):
+        with self.lock:
+            timers = {name: {"count": count, "sum_seconds": total, "max_seconds": longest} for name, (count, total, longest) in self.timers.items()}
+            counters = dict(self.counters)
+        return {"uptime_seconds": time.time() - self.started, "timers": timers, "counters": counters}
+
+    def to_prometheus(self, snapshot):
+        lines = [
+            "# TYPE balance_uptime_seconds gauge",
+            f"balance_uptime_seconds {snapshot['uptime_seconds']:.3f}",
+            "# TYPE balance_stage_seconds summary",
+        ]
+        for name, timer in sorted(snapshot["timers"].items()):
+            lines.append(f'balance_stage_seconds_count{{stage="{name}"}} {timer["count"]}')
+            lines.append(f'balance_stage_seconds_sum{{stage="{name}"}} {timer["sum_seconds"]:.6f}')
+        lines.append("# TYPE balance_stage_max_seconds gauge")
+        for name, timer in sorted(snapshot["timers"].items()):
+            lines.append(f'balance_stage_max_seconds{{stage="{name}"}} {timer["max_seconds"]:.6f}')
+        lines.append("# TYPE balance_events_total counter")
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f'balance_events_total{{event="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self): # 임시 파일에 쓰고 교체해, 수집기가 반쯤 쓰인 파일을 읽지 않게 한다.
+        snapshot = self.snapshot()
+        if self.path.endswith(".prom"):
+            text = self.to_prometheus(snapshot)
+        else:
+            text = json.dumps(snapshot, indent=2) + "\n"
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(text)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,101 @@
+# 병렬 집계 : 큰 입력을 여러 조각으로 나눠 프로세스 풀에서 각각 집계하고, 직렬화된 부분 집계(샤드)를 merge()로 합친다.
+#
+# import_file_parallel : CSV/JSONL 파일을 바이트 구간으로 나눠 project1의 Statistics로 가져온다.
+# aggregate_submissions_parallel : (학년, 성별, 응답) 제출 스트림을 묶음으로 나눠 CountingDataCollector로 집계한다.
+import argparse
+import csv
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from bulk_import import to_students
+from data_collector import CountingDataCollector
+from project1 import Statistics, batched
+
+
+def split_file(path, parts): # 파일을 거의 같은 크기의 바이트 구간 parts개로 나눈다.
+    size = os.path.getsize(path)
+    step = max(size // parts, 1)
+    bounds = list(range(0, size, step))[:parts] + [size]
+    return list(zip(bounds, bounds[1:]))
+
+
+def read_lines(path, start, end):
+    # 구간 안에서 시작하는 줄만 읽는다. 앞 구간에서 넘어온 줄은 앞 구간이 끝까지 읽는다.
+    with open(path, "rb") as file:
+        file.seek(start)
+        if start > 0:
+            file.readline()
+        while file.tell() <= end:
+            line = file.readline()
+            if not line:
+                return
+            yield line.decode("utf-8")
+
+
+def import_range(path, start, end, header, batch_size): # 프로세스 풀 작업 : 한 구간을 집계해 직렬화된 샤드로 돌려준다.
+    lines = read_lines(path, start, end)
+    if start == 0 and header is not None:
+        next(lines, None) # CSV 헤더 줄
+    if header is not None:
+        rows = csv.DictReader(lines, fieldnames=header) # 따옴표 안에 줄바꿈이 있는 CSV는 지원하지 않는다.
+    else:
+        rows = (json.loads(line) for line in lines if line.strip())
+    stats = Statistics()
+    for batch in batched(to_students(rows), batch_size):
+        stats.add_choices(batch)
+    return stats.to_bytes()
+
+
+def import_file_parallel(path, workers=None, batch_size=1000):
+    workers = workers or os.cpu_count() or 1
+    header = None
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as file:
+            header = next(csv.reader(io.StringIO(file.readline())))
+    stats = Statistics()
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(import_range, path, start, end, header, batch_size) for start, end in split_file(path, workers)]
+        for future in futures:
+            stats.merge(Statistics.from_bytes(future.result()))
+    return stats
+
+
+def aggregate_chunk(n_questions, submissions): # 프로세스 풀 작업 : 제출 묶음을 집계해 직렬화된 샤드로 돌려준다.
+    collector = CountingDataCollector(range(n_questions))
+    for grade, gender, responses in submissions:
+        collector.update_statistics(grade, gender, responses)
+    return collector.to_bytes()
+
+
+def aggregate_submissions_parallel(submissions, choices, workers=None, chunk_size=50000):
+    workers = workers or os.cpu_count() or 1
+    collector = CountingDataCollector(choices)
+    iterator = iter(submissions)
+    with ProcessPoolExecutor(workers) as pool:
+        pending = []
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if chunk:
+                pending.append(pool.submit(aggregate_chunk, len(choices), chunk))
+            if pending and (len(pending) >= workers * 2 or not chunk): # 동시에 떠 있는 묶음 수를 제한해 메모리를 일정하게 유지한다.
+                collector.merge(CountingDataCollector.from_bytes(pending.pop(0).result(), choices))
+            if not chunk and not pending:
+                return collector
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CSV/JSONL 응답 파일을 여러 프로세스로 나눠 Statistics로 가져옵니다.")
+    parser.add_argument("path")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    stats = import_file_parallel(args.path, args.workers, args.batch_size)
+    stats.display_statistics()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# 응답 패턴 히스토그램 : 질문마다 선택지가 두 개이므로 한 사람의 응답 전체는 n비트 패턴 하나이다. (i번째 비트가 1이면 질문 i에서 선택 2)
+# 세그먼트마다 패턴별 인원만 세어 두면, 조건부 비율이나 두 질문의 동시 선택 개수를 참여자 수와 상관없이 패턴 수만큼만 보고 구할 수 있다.
+# 질문이 dense_bits개 이하면 2^n칸 배열을, 그보다 많으면 실제로 나온 패턴만 담는 딕셔너리(희소 히스토그램)를 쓴다.
+import json
+from array import array
+from math import sqrt
+
+from data_collector import GRADES, SEGMENTS
+
+
+class PatternIndex:
+    def __init__(self, choices, segments=SEGMENTS, dense_bits=12):
+        self.choices = choices
+        self.segments = list(segments)
+        self.segment_index = {segment: i for i, segment in enumerate(self.segments)}
+        self.n_questions = len(choices)
+        self.dense = self.n_questions <= dense_bits
+        if self.dense:
+            self.histograms = [array("q", [0]) * (1 << self.n_questions) for _ in self.segments] # 패턴 -> 인원
+        else:
+            self.histograms = [{} for _ in self.segments]
+        self.totals = array("q", [0]) * len(self.segments)
+        self.version = 0
+        self.segment_versions = array("q", [0]) * len(self.segments)
+        self.pair_cache = {} # 세그먼트 -> (세그먼트 버전, 선택 2 개수, 둘 다 선택 2인 개수)
+        self.report_version = None
+        self.report = ""
+
+    def pattern(self, responses): # 응답 리스트 -> 비트 패턴, 모든 질문에 답한 응답만 받는다.
+        if len(responses) != self.n_questions:
+            raise ValueError("Incomplete responses")
+        bits = 0
+        for i, response in enumerate(responses):
+            if response == 2:
+                bits |= 1 << i
+            elif response != 1:
+                raise ValueError("Unknown option")
+        return bits
+
+    def update_statistics(self, grade, gender, responses): # CountingDataCollector와 같은 시그니처, 로그 재생에도 그대로 쓴다.
+        if grade not in self.segment_index or gender not in self.segment_index:
+            raise ValueError("Unknown segment")
+        bits = self.pattern(responses)
+        for segment in (grade, gender):
+            index = self.segment_index[segment]
+            histogram = self.histograms[index]
+            if self.dense:
+                histogram[bits] += 1
+            else:
+                histogram[bits] = histogram.get(bits, 0) + 1
+            self.totals[index] += 1
+            self.segment_versions[index] += 1
+        self.version += 1
+
+    def load_log(self, response_log, offset=None): # 응답 로그(offset이 있으면 그 뒤)를 읽어 히스토그램에 더한다. 질문 구성이 달랐던 기록은 건너뛴다.
+        count = 0
+        records = response_log.scan() if offset is None else response_log.scan(offset)
+        for grade, gender, responses, _ in records:
+            if len(responses) == self.n_questions and grade in self.segment_index and gender in self.segment_index:
+                self.update_statistics(grade, gender, responses)
+                count += 1
+        return count
+
+    def to_bytes(self): # 헤더 길이(4바이트) + JSON 헤더 + totals + 세그먼트별 히스토그램
+        header = json.dumps({"segments": self.segments, "n_questions": self.n_questions, "dense": self.dense}).encode("utf-8")
+        body = bytearray(len(header).to_bytes(4, "little") + header + self.totals.tobytes())
+        width = (self.n_questions + 7) // 8
+        for histogram in self.histograms:
+            if self.dense:
+                body += histogram.tobytes()
+            else: # 희소 히스토그램 : 항목 수 + (패턴 width바이트 + 인원 int64) 반복
+                body += len(histogram).to_bytes(8, "little")
+                for bits, count in histogram.items():
+                    body += bits.to_bytes(width, "little") + count.to_bytes(8, "little")
+        return bytes(body)
+
+    def load_bytes(self, data): # to_bytes로 저장한 히스토그램을 불러온다. 질문이나 세그먼트 구성이 다르면 False
+        size = int.from_bytes(data[:4], "little")
+        header = json.loads(data[4:4 + size].decode("utf-8"))
+        if (header["segments"], header["n_questions"], header["dense"]) != (self.segments, self.n_questions, self.dense):
+            return False
+        offset = 4 + size
+        totals = array("q")
+        totals.frombytes(data[offset:offset + len(self.segments) * totals.itemsize])
+        offset += len(totals) * totals.itemsize
+        width = (self.n_questions + 7) // 8
+        histograms = []
+        for _ in self.segments:
+            if self.dense:
+                histogram = array("q")
+                histogram.frombytes(data[offset:offset + (1 << self.n_questions) * histogram.itemsize])
+                offset += len(histogram) * histogram.itemsize
+            else:
+                histogram = {}
+                entries = int.from_bytes(data[offset:offset + 8], "little")
+                offset += 8
+                for _ in range(entries):
+                    bits = int.from_bytes(data[offset:offset + width], "little")
+                    histogram[bits] = int.from_bytes(data[offset + width:offset + width + 8], "little")
+                    offset += width + 8
+            histograms.append(histogram)
+        self.histograms = histograms
+        self.totals = totals
+        for i in range(len(self.segment_versions)):
+            self.segment_versions[i] += 1
+        self.version += 1
+        return True
+
+    def items(self, segment): # (패턴, 인원) 중 인원이 있는 것만
+        histogram = self.histograms[self.segment_index[segment]]
+        if self.dense:
+            return ((bits, count) for bits, count in enumerate(histogram) if count)
+        return list(histogram.items()) # 다른 스레드에서 읽는 동안 딕셔너리가 커져도 안전하도록 복사한다.
+
+    def total(self, segment):
+        return self.totals[self.segment_index[segment]]
+
+    def pattern_count(self, segment, responses):
+        bits = self.pattern(responses)
+        histogram = self.histograms[self.segment_index[segment]]
+        return histogram[bits] if self.dense else histogram.get(bits, 0)
+
+    def pair_counts(self, segment): # 질문별 선택 2 인원과 질문 쌍별로 둘 다 선택 2인 인원, 세그먼트 버전이 바뀔 때만 다시 센다.
+        version = self.segment_versions[self.segment_index[segment]]
+        cached = self.pair_cache.get(segment)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+        n = self.n_questions
+        ones = array("q", [0]) * n
+        both = array("q", [0]) * (n * n)
+        for bits, count in self.items(segment):
+            chosen = [i for i in range(n) if bits >> i & 1]
+            for i in chosen:
+                ones[i] += count
+                row = i * n
+                for j in chosen:
+                    both[row + j] += count
+        self.pair_cache[segment] = (version, ones, both)
+        return ones, both
+
+    def combined_pair_counts(self, segments): # 여러 세그먼트를 합친 (인원, 선택 2 인원, 동시 선택 2 인원)
+        n = self.n_questions
+        total = 0
+        ones = array("q", [0]) * n
+        both = array("q", [0]) * (n * n)
+        for segment in segments:
+            segment_ones, segment_both = self.pair_counts(segment)
+            total += self.total(segment)
+            for i in range(n):
+                ones[i] += segment_ones[i]
+            for i in range(n * n):
+                both[i] += segment_both[i]
+        return total, ones, both
+
+    def cooccurrence(self, segment, question1, option1, question2, option2): # 질문1에서 option1, 질문2에서 option2를 고른 인원
+        ones, both = self.pair_counts(segment)
+        n11 = both[question1 * self.n_questions + question2]
+        if (option1, option2) == (2, 2):
+            return n11
+        if (option1, option2) == (2, 1):
+            return ones[question1] - n11
+        if (option1, option2) == (1, 2):
+            return ones[question2] - n11
+        return self.total(segment) - ones[question1] - ones[question2] + n11
+
+    def conditional(self, segment, given_question, given_option, question, option):
+        # given_question에서 given_option을 고른 사람 중 question에서 option을 고른 비율(%)
+        ones, _ = self.pair_counts(segment)
+        given = ones[given_question] if given_option == 2 else self.total(segment) - ones[given_question]
+        if given == 0:
+            return 0.0
+        return self.cooccurrence(segment, given_question, given_option, question, option) / given * 100
+
+    def correlation_matrix(self, segment=None): # 질문 x 질문 phi 계수 (두 이진 변수의 피어슨 상관계수), segment가 없으면 전체 참여자
+        segments = GRADES if segment is None else [segment] # 모든 참여자는 학년을 하나씩 고르므로 학년을 합치면 전체이다.
+        total, ones, both = self.combined_pair_counts([s for s in segments if s in self.segment_index])
+        n = self.n_questions
+        matrix = [[0.0] * n for _ in range(n)]
+        for i in range(n):
+            for j in range(n):
+                n11 = both[i * n + j]
+                denominator = ones[i] * (total - ones[i]) * ones[j] * (total - ones[j])
+                if denominator:
+                    n00 = total - ones[i] - ones[j] + n11
+                    n10 = ones[i] - n11
+                    n01 = ones[j] - n11
+                    matrix[i][j] = (n11 * n00 - n10 * n01) / sqrt(denominator)
+        return matrix
+
+    def render_correlation(self): # 통계 화면에 붙이는 상관계수 표, 집계가 바뀌었을 때만 다시 만든다.
+        version = self.version # 포맷하기 전에 읽어, 도중에 들어온 제출은 다음 호출에서 반영한다.
+        if self.report_version != version:
+            n = self.n_questions
+            lines = ["질문 간 상관계수 (전체):\n", "        " + "".join(f"{f'Q{j + 1}':>7}" for j in range(n)) + "\n"]
+            for i, row in enumerate(self.correlation_matrix()):
+                lines.append(f"{f'Q{i + 1}':<8}" + "".join(f"{value:>7.2f}" for value in row) + "\n")
+            self.report = "".join(lines)
+            self.report_version = version
+        return self.report
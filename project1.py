@@ -1,5 +1,15 @@
+import argparse
+import random
+import time
 from abc import ABC, abstractmethod
-from collections import defaultdict
+from itertools import islice
+
+import numpy as np
+
+from columnar_statistics import ColumnarStatistics, GENDERS, GRADES
+from question_bank import BankQuestion, shared_bank
+from report_export import STATISTICS_COLUMNS, export, statistics_rows
+from significance import FactorTest
 
 
 # 팩토리 패턴
@@ -9,54 +19,23 @@ class BalanceQuestion(ABC):
         pass
 
 
-class Question1(BalanceQuestion):
-    def get_question(self):
-        return "성적 C+ 7개(재수강 가능) VS 성적 B0 7개"
-
-
-class Question2(BalanceQuestion):
-    def get_question(self):
-        return "학교 70년 다니기 VS 70년대 외대 다니기"
-
-
-class Question3(BalanceQuestion):
-    def get_question(self):
-        return "교수님과 70시간 면담 VS 70시간 도서관 공부"
-
-
-class Question4(BalanceQuestion):
-    def get_question(self):
-        return "전공 70학점 듣기 VS 교양 70학점 듣기"
-
-
-class Question5(BalanceQuestion):
-    def get_question(self):
-        return "시간표 70% 1교시 VS 시간표 70% 9교시"
-
-
-class Question6(BalanceQuestion):
-    def get_question(self):
-        return "학식 70번 먹기 VS 70번 연속 굶기"
+BalanceQuestion.register(BankQuestion) # 질문 은행에서 읽은 질문도 BalanceQuestion으로 취급한다.
 
 
 class QuestionFactory:
+    # 질문은 공유 질문 은행(questions.jsonl)에서 읽는다. 질문 type -> 클래스 선택은 은행의 QUESTION_TYPES 딕셔너리가 맡고,
+    # 같은 id의 질문 객체는 은행이 캐시해 재사용한다.
     @staticmethod
     def create_question(question_id):
-        if question_id == 1:
-            return Question1()
-        elif question_id == 2:
-            return Question2()
-        elif question_id == 3:
-            return Question3()
-        elif question_id == 4:
-            return Question4()
-        elif question_id == 5:
-            return Question5()
-        elif question_id == 6:
-            return Question6()
-        else:
+        try:
+            return shared_bank().get(question_id)
+        except KeyError:
             raise ValueError("Unknown question id")
 
+    @staticmethod
+    def question_ids():
+        return shared_bank().ids()
+
 
 # 전략패턴
 class StudentStrategy(ABC):
@@ -105,8 +84,39 @@ class FemaleSeniorStrategy(StudentStrategy):
         return "Female", "Senior"
 
 
+class StudentStrategyFactory:
+    # 성별/학년 표기(영문, 한글)를 공유 전략 객체로 바꿔준다. 전략은 상태가 없으므로 학생마다 새로 만들지 않는다.
+    strategies = {
+        ("Male", "Freshman"): MaleFreshmanStrategy(),
+        ("Male", "Sophomore"): MaleSophomoreStrategy(),
+        ("Male", "Junior"): MaleJuniorStrategy(),
+        ("Male", "Senior"): MaleSeniorStrategy(),
+        ("Female", "Freshman"): FemaleFreshmanStrategy(),
+        ("Female", "Sophomore"): FemaleSophomoreStrategy(),
+        ("Female", "Junior"): FemaleJuniorStrategy(),
+        ("Female", "Senior"): FemaleSeniorStrategy(),
+    }
+    genders = {"male": "Male", "m": "Male", "남자": "Male", "남": "Male",
+               "female": "Female", "f": "Female", "여자": "Female", "여": "Female"}
+    grades = {"freshman": "Freshman", "1": "Freshman", "1학년": "Freshman",
+              "sophomore": "Sophomore", "2": "Sophomore", "2학년": "Sophomore",
+              "junior": "Junior", "3": "Junior", "3학년": "Junior",
+              "senior": "Senior", "4": "Senior", "4학년": "Senior"}
+
+    @staticmethod
+    def create_strategy(gender, grade):
+        try:
+            key = (StudentStrategyFactory.genders[str(gender).strip().lower()],
+                   StudentStrategyFactory.grades[str(grade).strip().lower()])
+        except KeyError:
+            raise ValueError(f"Unknown student info: {gender}, {grade}")
+        return StudentStrategyFactory.strategies[key]
+
+
 # 학생 클래스
 class Student:
+    __slots__ = ("gender", "grade", "choices") # 인스턴스마다 __dict__를 두지 않는다.
+
     def __init__(self, strategy: StudentStrategy):
         self.gender, self.grade = strategy.get_student_info()
         self.choices = {}
@@ -117,37 +127,157 @@ class Student:
 
 class Statistics:
     def __init__(self):
-        self.data = defaultdict(lambda: defaultdict(lambda: defaultdict(lambda: defaultdict(int))))
+        self.table = ColumnarStatistics(QuestionFactory.question_ids()) # [성별, 학년, 질문, 선택지] 개수 텐서
+
+    @property
+    def data(self): # 성별 -> 학년 -> 질문 -> 선택지 -> 개수 (기존 중첩 딕셔너리 형태)
+        return self.table.to_nested()
 
     def add_choice(self, student: Student):
-        gender = student.gender
-        grade = student.grade
-        for question_id, choice in student.choices.items():
-            self.data[gender][grade][question_id][choice] += 1
+        self.table.add_students([student])
+
+    def add_choices(self, students):
+        # 한 묶음의 학생을 코드 배열로 모은 뒤 벡터 연산 한 번으로 반영한다.
+        self.table.add_students(students)
+
+    def merge(self, other): # 다른 프로세스에서 모은 Statistics를 합친다.
+        self.table.merge(other.table)
+        return self
+
+    def to_bytes(self):
+        return self.table.to_bytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        stats = cls()
+        stats.table = ColumnarStatistics.from_bytes(data)
+        return stats
+
+    def rollup(self, gender=None, grade=None): # 지정하지 않은 축은 모두 합친 [질문, 선택지] 개수
+        return self.table.rollup(gender, grade)
+
+    def percentages(self, gender=None, grade=None):
+        return self.table.percentages(gender, grade)
+
+    def significance(self): # 질문마다 성별/학년에 따라 선택이 갈리는지 모든 질문을 한 번에 검정한다.
+        counts = self.table.counts
+        return [FactorTest("Gender", GENDERS, counts.sum(axis=1)), FactorTest("Grade", GRADES, counts.sum(axis=0))]
+
+    def display_significance(self, alpha=0.05):
+        for test in self.significance():
+            print(f"Significance by {test.name} (BH-adjusted p < {alpha}):")
+            significant = test.significant(alpha)
+            if not significant:
+                print("  none")
+            for question_code in significant:
+                print(f"  Question {self.table.question_ids[question_code]} [{test.test[question_code]}]: chi2={test.statistic[question_code]:.2f} "
+                      f"df={test.dof[question_code]} p={test.p_value[question_code]:.3g} adjusted p={test.adjusted_p[question_code]:.3g} "
+                      f"Cramer's V={test.cramers_v[question_code]:.3f}")
+                for level_code, level in enumerate(test.levels):
+                    share, low, high = (values[level_code, question_code, 0] * 100 for values in (test.share, test.low, test.high))
+                    print(f"    {level}: choice '{self.table.choices[0]}' {share:.1f}% (95% CI {low:.1f}-{high:.1f}), h={test.cohens_h[level_code, question_code, 0]:+.3f}")
+
+    def export(self, path): # 확장자(.csv, .jsonl, .bgc)에 맞는 형식으로 [성별, 학년, 질문, 선택지] 개수표를 내보낸다.
+        return export(statistics_rows(self), STATISTICS_COLUMNS, path)
 
     def display_statistics(self):
-        for gender in self.data:
-            for grade in self.data[gender]:
+        counts = self.table.counts
+        answered = counts.sum(axis=(2, 3)) # [성별, 학년] 응답 수, 응답이 없는 조합은 건너뛴다.
+        for gender_code, gender in enumerate(GENDERS):
+            for grade_code, grade in enumerate(GRADES):
+                if not answered[gender_code, grade_code]:
+                    continue
                 print(f"Statistics for {gender}, {grade}:")
-                for question_id in self.data[gender][grade]:
+                for question_code, question_id in enumerate(self.table.question_ids):
+                    question_counts = counts[gender_code, grade_code, question_code]
+                    if not question_counts.any():
+                        continue
                     print(f"  Question {question_id}:")
-                    for choice, count in self.data[gender][grade][question_id].items():
-                        print(f"    Choice '{choice}': {count}")
+                    for choice_code in np.flatnonzero(question_counts):
+                        print(f"    Choice '{self.table.choices[choice_code]}': {question_counts[choice_code]}")
 
 
 
 
 # 학생 정보 입력 및 질문 선택
 def get_student_choices(student):
-    for i in range(1, 7):
+    for i in QuestionFactory.question_ids():
         question = QuestionFactory.create_question(i)
         print(question.get_question())
         choice = input(f"Choose for Question {i}: ")
         student.make_choice(i, choice)
 
 
+# 가상 학생 생성 : 8가지 StudentStrategy 중 하나를 고르고, 질문마다 선택 1을 고를 확률에 따라 응답한다.
+def generate_students(count, rng, distribution):
+    strategies = list(StudentStrategyFactory.strategies.values())
+    question_ids = QuestionFactory.question_ids()
+    for _ in range(count):
+        student = Student(rng.choice(strategies))
+        for i, probability in zip(question_ids, distribution):
+            student.make_choice(i, "1" if rng.random() < probability else "2")
+        yield student
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def validate_distribution(distribution): # 질문마다 하나씩, 0~1 사이의 확률이어야 한다.
+    question_count = len(QuestionFactory.question_ids())
+    if len(distribution) != question_count:
+        raise ValueError(f"distribution needs {question_count} probabilities (one per question), got {len(distribution)}")
+    for probability in distribution:
+        if not 0 <= probability <= 1:
+            raise ValueError(f"probability out of range [0, 1]: {probability}")
+
+
+def run_synthetic(count, seed=None, distribution=None, batch_size=10000):
+    if distribution is None:
+        distribution = [0.5] * len(QuestionFactory.question_ids())
+    validate_distribution(distribution)
+    rng = random.Random(seed)
+    stats = Statistics()
+    start = time.perf_counter()
+    for batch in batched(generate_students(count, rng, distribution), batch_size):
+        stats.add_choices(batch)
+    elapsed = time.perf_counter() - start
+    return stats, elapsed
+
+
 # 메인 함수
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="밸런스 게임 통계")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="입력 없이 가상 학생 N명을 생성해 집계합니다.")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--distribution", help="질문별 선택 1 확률 (쉼표로 구분, 기본: 모두 0.5)")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--quiet", action="store_true", help="통계 출력 없이 처리량만 출력합니다.")
+    parser.add_argument("--significance", action="store_true", help="질문별로 성별/학년에 따른 차이를 검정해 출력합니다.")
+    parser.add_argument("--export", metavar="PATH", help="집계표를 CSV(.csv), JSONL(.jsonl), 컬럼형(.bgc) 파일로 내보냅니다.")
+    args = parser.parse_args(argv)
+
+    if args.synthetic is not None:
+        try:
+            distribution = [float(value) for value in args.distribution.split(",")] if args.distribution else None
+            stats, elapsed = run_synthetic(args.synthetic, args.seed, distribution, args.batch_size)
+        except ValueError as error:
+            parser.error(f"--distribution: {error}")
+        if not args.quiet:
+            stats.display_statistics()
+        rate = args.synthetic / elapsed if elapsed > 0 else float("inf")
+        print(f"{args.synthetic} students in {elapsed:.2f}s ({rate:,.0f} students/s)")
+        if args.significance:
+            stats.display_significance()
+        if args.export:
+            print(f"{stats.export(args.export)} rows -> {args.export}")
+        return
+
     strategies = [MaleFreshmanStrategy(), MaleFreshmanStrategy()]
     students = [Student(strategy) for strategy in strategies]
 
@@ -159,6 +289,10 @@ def main():
         stats.add_choice(student)
 
     stats.display_statistics()
+    if args.significance:
+        stats.display_significance()
+    if args.export:
+        stats.export(args.export)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+# 질문 은행 : 질문을 코드에 박아 두지 않고 JSONL 파일에서 읽는다. 세 가지 화면(GUI 1, GUI 2, project1)이 같은 은행을 공유한다.
+#
+# 파일 구조 : 한 줄에 질문 하나 {"id": 1, "type": "balance", "option1": "...", "option2": "..."}
+# 처음 열 때 id -> 파일 위치 인덱스를 만들어 옆에 .idx 파일로 저장하고, 질문 본문은 요청될 때만 읽어 온다.
+# 만들어진 질문 객체는 id별로 하나만 두고 재사용한다. (플라이웨이트, 최근 사용 순으로 cache_size개까지 보관)
+import json
+import os
+import struct
+from array import array
+from collections import OrderedDict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BANK_PATH = os.path.join(HERE, "questions.jsonl")
+INDEX_HEADER = struct.Struct("<4sqq") # MAGIC, 은행 파일 크기, 은행 파일 수정 시각(ns)
+INDEX_MAGIC = b"BQI1"
+
+
+class BankQuestion: # 양자택일 질문
+    __slots__ = ("id", "option1", "option2")
+
+    def __init__(self, record):
+        self.id = record["id"]
+        self.option1 = record["option1"]
+        self.option2 = record["option2"]
+
+    def get_question(self):
+        return f"{self.option1} VS {self.option2}"
+
+
+QUESTION_TYPES = {"balance": BankQuestion} # 팩토리 패턴 : 질문 type -> 질문 클래스
+
+
+class QuestionBank:
+    def __init__(self, path=DEFAULT_BANK_PATH, cache_size=4096, question_types=QUESTION_TYPES):
+        self.path = path
+        self.cache_size = cache_size
+        self.question_types = question_types
+        self.cache = OrderedDict() # id -> 질문 객체
+        self.offsets = self.load_index() # id -> 파일 위치
+
+    def load_index(self):
+        stat = os.stat(self.path)
+        index_path = self.path + ".idx"
+        try:
+            with open(index_path, "rb") as file:
+                magic, size, mtime = INDEX_HEADER.unpack(file.read(INDEX_HEADER.size))
+                if (magic, size, mtime) == (INDEX_MAGIC, stat.st_size, stat.st_mtime_ns):
+                    pairs = array("q")
+                    pairs.frombytes(file.read())
+                    return dict(zip(pairs[::2], pairs[1::2]))
+        except (OSError, struct.error, ValueError):
+            pass
+        offsets = self.build_index()
+        pairs = array("q")
+        for question_id, offset in offsets.items():
+            pairs.extend((question_id, offset))
+        try:
+            with open(index_path, "wb") as file:
+                file.write(INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns))
+                file.write(pairs.tobytes())
+        except OSError: # 읽기 전용 위치면 인덱스를 저장하지 않고 메모리에서만 쓴다.
+            pass
+        return offsets
+
+    def build_index(self):
+        offsets = {}
+        with open(self.path, "rb") as file:
+            offset = 0
+            for line in file:
+                if line.strip():
+                    question_id = json.loads(line)["id"]
+                    if question_id in offsets:
+                        raise ValueError(f"Duplicate question id: {question_id}")
+                    offsets[question_id] = offset
+                offset += len(line)
+        return offsets
+
+    def read_record(self, question_id):
+        with open(self.path, "rb") as file:
+            file.seek(self.offsets[question_id])
+            return json.loads(file.readline())
+
+    def get(self, question_id):
+        question = self.cache.get(question_id)
+        if question is not None:
+            self.cache.move_to_end(question_id)
+            return question
+        if question_id not in self.offsets:
+            raise KeyError(question_id)
+        record = self.read_record(question_id)
+        question = self.question_types[record.get("type", "balance")](record)
+        self.cache[question_id] = question
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return question
+
+    def ids(self): # 파일에 적힌 순서
+        return list(self.offsets)
+
+    def questions(self, ids=None):
+        for question_id in self.ids() if ids is None else ids:
+            yield self.get(question_id)
+
+    def __len__(self):
+        return len(self.offsets)
+
+
+shared = None
+
+
+def shared_bank(): # 모든 화면이 같은 은행 객체를 쓰도록 한 번만 연다.
+    global shared
+    if shared is None:
+        shared = QuestionBank()
+    return shared
@@ -0,0 +1,33 @@
+# 버전 기반 리포트 캐시 : 통계 화면 행을 세그먼트 블록 단위로 캐싱하고, 버전이 바뀐 블록만 다시 만든다.
+from data_collector import GRADES, GENDERS
+
+
+class ReportRows: # 가상화된 통계 보기용 행 캐시 : (세그먼트, 질문, 인원, 선택 1 비율, 선택 2 비율) 행을 세그먼트 단위로 캐싱한다.
+    def __init__(self, collector, segments=GRADES + GENDERS):
+        self.collector = collector
+        self.segments = list(segments)
+        self.version = None
+        self.segment_versions = {}
+        self.blocks = {} # 세그먼트 -> 행 리스트
+        self.all_rows = []
+
+    def rows(self): # 바뀐 것이 없으면 같은 리스트 객체를 돌려준다.
+        self.collector.refresh() # 리포트마다 한 번 저장소를 확인한다. (SQLite는 다른 키오스크의 커밋을 읽는다.)
+        version = self.collector.version # 버전은 행을 만들기 전에 읽는다. 다른 스레드에서 만드는 동안 제출이 들어와도 다음 호출에서 다시 만들어진다.
+        if self.version == version:
+            return self.all_rows
+        for segment in self.segments:
+            segment_version = self.collector.segment_version(segment)
+            if self.segment_versions.get(segment) != segment_version:
+                self.blocks[segment] = self._segment_rows(segment)
+                self.segment_versions[segment] = segment_version
+        self.all_rows = [row for segment in self.segments for row in self.blocks[segment]]
+        self.version = version
+        return self.all_rows
+
+    def _segment_rows(self, segment):
+        total = self.collector.total(segment)
+        if total == 0:
+            return []
+        return [(segment, i, total, self.collector.percent(segment, i, 1), self.collector.percent(segment, i, 2))
+                for i in range(self.collector.n_questions)]
@@ -0,0 +1,195 @@
+# 보고서 내보내기 : 세그먼트 x 질문 x 선택지 집계표(와 원본 제출)를 CSV, JSONL, 컬럼형 바이너리로 스트리밍해 저장한다.
+# 행은 제너레이터로 만들고 chunk_rows개씩 묶어 한 번에 인코딩해 쓰므로, 수백만 행이어도 메모리 사용량은 묶음 크기로 고정된다.
+#
+# 컬럼형 파일(.bgc) : MAGIC + u32(스키마 길이) + JSON 스키마 + 묶음 반복
+# 묶음 구조 : u32(행 수) + 열마다 [int8: int8 배열 | int: int64 배열 | float: float64 배열 | str: u32(새 사전 항목 수) + (u32 길이 + UTF-8)... + u32 코드 배열]
+# 문자열 열은 파일 전체에서 공유하는 사전으로 인코딩하고, 묶음마다 처음 나온 값만 사전에 덧붙인다.
+#
+# 사용 예 : python report_export.py --output table.csv --submissions submissions.bgc
+import argparse
+import csv
+import io
+import json
+import os
+import struct
+from array import array
+from itertools import islice
+
+from data_collector import CountingDataCollector
+from question_bank import shared_bank
+from response_log import ResponseLog, DEFAULT_LOG_PATH, MAGIC as LOG_MAGIC
+from snapshot import SnapshotStore, DEFAULT_SNAPSHOT_PATH
+
+CHUNK_ROWS = 65536
+COLUMNAR_MAGIC = b"BGC1"
+U32 = struct.Struct("<I")
+ARRAY_TYPES = {"int8": "b", "int": "q", "float": "d"} # 숫자 열 타입 -> array 타입 코드
+COLLECTOR_COLUMNS = [("segment", "str"), ("question", "int"), ("option", "int"), ("count", "int"), ("total", "int"), ("percent", "float")]
+STATISTICS_COLUMNS = [("gender", "str"), ("grade", "str"), ("question", "str"), ("choice", "str"), ("count", "int")]
+
+
+class CSVExporter:
+    def __init__(self, file, columns):
+        self.file = file
+        self.write_chunk([[name for name, _ in columns]]) # 헤더
+
+    def write_chunk(self, rows):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        self.file.write(buffer.getvalue().encode("utf-8"))
+
+
+class JSONLExporter:
+    def __init__(self, file, columns):
+        self.file = file
+        self.names = [name for name, _ in columns]
+
+    def write_chunk(self, rows):
+        names = self.names
+        text = "".join(json.dumps(dict(zip(names, row)), ensure_ascii=False) + "\n" for row in rows)
+        self.file.write(text.encode("utf-8"))
+
+
+class ColumnarExporter:
+    def __init__(self, file, columns):
+        self.file = file
+        self.columns = columns
+        self.dictionaries = [{} if kind == "str" else None for _, kind in columns] # 문자열 열마다 값 -> 코드
+        schema = json.dumps({"columns": [{"name": name, "type": kind} for name, kind in columns]}).encode("utf-8")
+        file.write(COLUMNAR_MAGIC + U32.pack(len(schema)) + schema)
+
+    def write_chunk(self, rows):
+        out = bytearray(U32.pack(len(rows)))
+        for index, (_, kind) in enumerate(self.columns):
+            values = [row[index] for row in rows]
+            if kind == "str":
+                dictionary = self.dictionaries[index]
+                added = []
+                codes = array("I")
+                for value in values:
+                    value = str(value)
+                    code = dictionary.get(value)
+                    if code is None:
+                        code = dictionary[value] = len(dictionary)
+                        added.append(value)
+                    codes.append(code)
+                out += U32.pack(len(added))
+                for value in added:
+                    encoded = value.encode("utf-8")
+                    out += U32.pack(len(encoded)) + encoded
+                out += codes.tobytes()
+            else:
+                out += array(ARRAY_TYPES[kind], values).tobytes()
+        self.file.write(out)
+
+
+EXPORTERS = {".csv": CSVExporter, ".jsonl": JSONLExporter, ".bgc": ColumnarExporter} # 확장자 -> 내보내기 클래스
+
+
+def export(rows, columns, path, chunk_rows=CHUNK_ROWS): # 확장자에 맞는 형식으로 행을 묶음 단위로 써서 행 수를 돌려준다.
+    extension = os.path.splitext(path)[1]
+    if extension not in EXPORTERS:
+        raise ValueError(f"Unknown export format: {path}")
+    iterator = iter(rows)
+    count = 0
+    with open(path, "wb") as file:
+        exporter = EXPORTERS[extension](file, columns)
+        while True:
+            chunk = list(islice(iterator, chunk_rows))
+            if not chunk:
+                return count
+            exporter.write_chunk(chunk)
+            count += len(chunk)
+
+
+def read_columnar(path): # 컬럼형 파일을 행 튜플로 다시 읽는다.
+    with open(path, "rb") as file:
+        if file.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError("Unknown columnar format")
+        schema = json.loads(file.read(U32.unpack(file.read(U32.size))[0]))
+        columns = [(column["name"], column["type"]) for column in schema["columns"]]
+        dictionaries = [[] for _ in columns]
+        while True:
+            header = file.read(U32.size)
+            if not header:
+                return
+            count = U32.unpack(header)[0]
+            values = []
+            for index, (_, kind) in enumerate(columns):
+                if kind == "str":
+                    dictionary = dictionaries[index]
+                    for _ in range(U32.unpack(file.read(U32.size))[0]):
+                        dictionary.append(file.read(U32.unpack(file.read(U32.size))[0]).decode("utf-8"))
+                    codes = array("I")
+                    codes.frombytes(file.read(count * codes.itemsize))
+                    values.append([dictionary[code] for code in codes])
+                else:
+                    column = array(ARRAY_TYPES[kind])
+                    column.frombytes(file.read(count * column.itemsize))
+                    values.append(column)
+            yield from zip(*values)
+
+
+def collector_rows(collector): # (세그먼트, 질문 id, 선택지, 개수, 세그먼트 인원, 비율)
+    collector.refresh()
+    for segment in collector.segments:
+        total = collector.total(segment)
+        for i, question_id in enumerate(collector.choices):
+            for option in range(1, collector.n_options + 1):
+                count = collector.count(segment, i, option)
+                yield segment, question_id, option, count, total, count / total * 100 if total else 0.0
+
+
+def statistics_rows(stats): # project1 Statistics의 [성별, 학년, 질문, 선택지] 텐서를 행으로 펼친다.
+    table = stats.table
+    for gender, by_grade in zip(table.gender_index, table.counts.tolist()):
+        for grade, by_question in zip(table.grade_index, by_grade):
+            for question_id, by_choice in zip(table.question_ids, by_question):
+                for choice, count in zip(table.choices, by_choice):
+                    yield gender, grade, question_id, choice, count
+
+
+def submission_columns(choices):
+    return [("grade", "str"), ("gender", "str")] + [(f"q{question_id}", "int8") for question_id in choices] # 응답은 0~2
+
+
+def submission_rows(response_log, n_questions): # 응답 로그의 원본 제출, 응답하지 않은 질문은 0
+    for grade, gender, responses, _ in response_log.scan():
+        yield (grade, gender, *responses, *[0] * (n_questions - len(responses)))
+
+
+def load_collector(response_log, snapshot_store, choices):
+    # 스냅샷 + 그 뒤 로그로 집계를 만든다. 실행 중인 키오스크의 로그를 건드리지 않도록 잘린 꼬리를 정리하지 않고 읽기만 한다.
+    collector = CountingDataCollector(choices)
+    offset = snapshot_store.load(collector)
+    log_size = os.path.getsize(response_log.path) if os.path.exists(response_log.path) else 0
+    if offset is None or offset > log_size:
+        collector = CountingDataCollector(choices)
+        offset = len(LOG_MAGIC)
+    for grade, gender, responses, _ in response_log.scan(offset):
+        collector.update_statistics(grade, gender, responses)
+    return collector
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="집계표와 원본 제출을 CSV(.csv), JSONL(.jsonl), 컬럼형(.bgc) 파일로 내보냅니다.")
+    parser.add_argument("--log", default=DEFAULT_LOG_PATH)
+    parser.add_argument("--snapshot", default=DEFAULT_SNAPSHOT_PATH)
+    parser.add_argument("--output", help="세그먼트 x 질문 x 선택지 집계표 경로")
+    parser.add_argument("--submissions", help="원본 제출 경로")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    choices = shared_bank().ids()
+    response_log = ResponseLog(args.log)
+    if args.output:
+        collector = load_collector(response_log, SnapshotStore(args.snapshot), choices)
+        count = export(collector_rows(collector), COLLECTOR_COLUMNS, args.output, args.chunk_rows)
+        print(f"{count} rows -> {args.output}")
+    if args.submissions:
+        count = export(submission_rows(response_log, len(choices)), submission_columns(choices), args.submissions, args.chunk_rows)
+        print(f"{count} rows -> {args.submissions}")
+
+
+if __name__ == "__main__":
+    main()
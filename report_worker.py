@@ -0,0 +1,67 @@
+# 백그라운드 리포트 작업자 : 통계 텍스트를 Tk 메인 스레드가 아닌 작업 스레드에서 만들고, root.after 폴링으로 화면에 반영한다.
+# 제출이 몰려 request()가 여러 번 호출되어도 작업 스레드는 가장 최근 상태로 한 번만 다시 만들고,
+# 화면은 interval_ms마다 최대 한 번만 다시 그린다. (요청 병합)
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class ReportWorker:
+    def __init__(self, root, render, apply, interval_ms=16):
+        self.root = root
+        self.render = render # 작업 스레드에서 호출, 리포트 텍스트를 돌려준다.
+        self.apply = apply # 메인 스레드에서 호출, 텍스트를 위젯에 반영한다.
+        self.interval_ms = interval_ms # 다시 그리기 최소 간격(ms), 기본값은 약 60fps
+        self.requested = threading.Event() # 다시 만들 일이 생겼다는 신호, 여러 번 set해도 한 번으로 합쳐진다.
+        self.lock = threading.Lock()
+        self.result = None # 아직 화면에 반영하지 않은 가장 최근 텍스트
+        self.applied = None # 마지막으로 화면에 반영한 텍스트
+        self.running = False
+        self.thread = None
+        self.poll_id = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="report-worker", daemon=True)
+        self.thread.start()
+        self.poll_id = self.root.after(self.interval_ms, self.poll)
+
+    def request(self): # 어느 스레드에서나 호출할 수 있다. (네트워크 수신, 대량 가져오기 등)
+        self.requested.set()
+
+    def run(self): # 작업 스레드 : 요청이 올 때까지 기다렸다가 가장 최근 상태로 리포트를 만든다.
+        while True:
+            self.requested.wait()
+            if not self.running:
+                return
+            self.requested.clear() # 만드는 동안 들어온 요청은 다음 차례에 한 번으로 처리된다.
+            try:
+                text = self.render()
+            except Exception: # DB 잠김 같은 일시적 오류로 작업 스레드가 끝나면 통계 화면이 다시는 갱신되지 않는다.
+                logger.exception("Report render failed")
+                continue
+            with self.lock:
+                self.result = text
+
+    def poll(self): # 메인 스레드 : interval_ms마다 새 결과가 있으면 한 번만 반영한다.
+        with self.lock:
+            text = self.result
+            self.result = None
+        if text is not None and text != self.applied:
+            self.apply(text)
+            self.applied = text
+        if self.running:
+            self.poll_id = self.root.after(self.interval_ms, self.poll)
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self.requested.set() # 대기 중인 작업 스레드를 깨워 종료시킨다.
+        self.thread.join()
+        if self.poll_id is not None:
+            self.root.after_cancel(self.poll_id)
+            self.poll_id = None
@@ -0,0 +1,147 @@
+# 추가 전용(append-only) 응답 로그 : 제출된 응답을 압축된 바이너리 레코드로 디스크에 기록하고, 재시작할 때 다시 재생해 통계를 복구한다.
+#
+# 파일 구조 : MAGIC(4바이트) + 레코드 반복
+# 레코드 구조 : varint(본문 길이) + 본문 + crc32(4바이트, little endian)
+# 본문 구조 : varint(학년 코드 * 성별 수 + 성별 코드) + varint(응답 수) + 응답 비트열(선택 2이면 1, 8개씩 1바이트)
+import mmap
+import os
+import time
+import zlib
+
+from data_collector import GRADES, GENDERS
+
+DEFAULT_LOG_PATH = "balance_responses.log"
+MAGIC = b"BGL1"
+CRC_SIZE = 4
+
+
+def encode_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(buffer, offset, end):
+    value = 0
+    shift = 0
+    while offset < end:
+        byte = buffer[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+    raise EOFError("Truncated varint")
+
+
+class ResponseLog:
+    def __init__(self, path, grades=GRADES, genders=GENDERS, sync_every=32, sync_interval=1.0):
+        self.path = path
+        self.grades = list(grades)
+        self.genders = list(genders)
+        self.grade_codes = {grade: i for i, grade in enumerate(self.grades)}
+        self.gender_codes = {gender: i for i, gender in enumerate(self.genders)}
+        self.sync_every = sync_every # 이 개수만큼 쌓이면 fsync
+        self.sync_interval = sync_interval # 마지막 fsync 이후 이 시간(초)이 지나면 fsync
+        self.fd = None
+        self.pending = 0 # 아직 fsync되지 않은 레코드 수
+        self.last_sync = time.monotonic()
+        self.end = None # 마지막으로 확인된 정상 레코드의 끝 위치
+
+    def encode(self, grade, gender, responses):
+        body = bytearray()
+        encode_varint(self.grade_codes[grade] * len(self.genders) + self.gender_codes[gender], body)
+        encode_varint(len(responses), body)
+        bits = bytearray((len(responses) + 7) // 8)
+        for i, response in enumerate(responses):
+            if response == 2:
+                bits[i >> 3] |= 1 << (i & 7)
+            elif response != 1:
+                raise ValueError("Unknown option")
+        body += bits
+        record = bytearray()
+        encode_varint(len(body), record)
+        record += body
+        record += zlib.crc32(body).to_bytes(CRC_SIZE, "little")
+        return bytes(record)
+
+    def decode(self, body):
+        demographic, offset = decode_varint(body, 0, len(body))
+        count, offset = decode_varint(body, offset, len(body))
+        grade = self.grades[demographic // len(self.genders)]
+        gender = self.genders[demographic % len(self.genders)]
+        responses = [2 if body[offset + (i >> 3)] >> (i & 7) & 1 else 1 for i in range(count)]
+        return grade, gender, responses
+
+    def scan(self, offset=len(MAGIC)): # (학년, 성별, 응답, 레코드 끝 위치)를 순서대로 돌려준다. 잘린 레코드를 만나면 멈춘다.
+        if not os.path.exists(self.path) or os.path.getsize(self.path) <= len(MAGIC):
+            return
+        with open(self.path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if buffer[:len(MAGIC)] != MAGIC:
+                raise ValueError("Unknown log format")
+            size = len(buffer)
+            while offset < size:
+                try:
+                    length, start = decode_varint(buffer, offset, size)
+                except EOFError:
+                    return
+                end = start + length + CRC_SIZE
+                if end > size:
+                    return
+                body = buffer[start:start + length]
+                if zlib.crc32(body) != int.from_bytes(buffer[end - CRC_SIZE:end], "little"):
+                    return
+                grade, gender, responses = self.decode(body)
+                yield grade, gender, responses, end
+                offset = end
+
+    def replay(self, collector=None, offset=len(MAGIC)): # 로그를 재생해 collector를 복구하고, 잘린 마지막 레코드는 잘라낸다.
+        end = offset
+        count = 0
+        for grade, gender, responses, end in self.scan(offset):
+            if collector is not None:
+                collector.update_statistics(grade, gender, responses)
+            count += 1
+        if os.path.exists(self.path):
+            size = os.path.getsize(self.path)
+            valid = end if size >= len(MAGIC) else 0 # 헤더조차 다 쓰이지 못한 파일은 비운다.
+            if size > valid:
+                os.truncate(self.path, valid)
+        self.end = end
+        return count
+
+    def open(self):
+        if self.fd is not None:
+            return
+        if self.end is None: # 재생하지 않고 바로 기록하는 경우에도 잘린 꼬리는 먼저 정리한다.
+            self.replay()
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        if os.fstat(self.fd).st_size == 0:
+            os.write(self.fd, MAGIC)
+            self.end = len(MAGIC)
+
+    def append(self, grade, gender, responses):
+        self.open()
+        record = self.encode(grade, gender, responses)
+        os.write(self.fd, record) # 레코드 하나를 한 번의 write로 기록해 프로세스가 죽어도 레코드가 섞이지 않게 한다.
+        self.end += len(record)
+        self.pending += 1
+        if self.pending >= self.sync_every or time.monotonic() - self.last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync_due(self): # 타이머에서 호출 : 제출이 끊겨도 fsync되지 않은 레코드가 sync_interval보다 오래 남지 않게 한다.
+        if self.pending and time.monotonic() - self.last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self): # 모아 둔 레코드를 한 번에 디스크로 내린다.
+        if self.fd is not None and self.pending:
+            os.fsync(self.fd)
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        if self.fd is not None:
+            self.sync()
+            os.close(self.fd)
+            self.fd = None
@@ -0,0 +1,28 @@
+# 플라이웨이트 패턴 : 화면마다 위젯을 한 번만 만들어 두고, 다시 표시할 때는 텍스트와 명령만 바꿔 재사용한다.
+class ScreenPool:
+    def __init__(self, root, frame_class):
+        self.root = root
+        self.frame_class = frame_class # 화면 하나를 담는 컨테이너 클래스 (예: tk.Frame)
+        self.builders = {} # 화면 이름 -> 위젯을 만드는 함수
+        self.screens = {} # 화면 이름 -> 이미 만들어진 프레임
+        self.current = None # 현재 표시 중인 화면 이름
+
+    def register(self, name, builder): # builder(frame)는 frame 안에 위젯을 한 번만 만든다.
+        self.builders[name] = builder
+
+    def show(self, name): # 현재 화면을 숨기고 요청한 화면을 표시한다. 처음 요청된 화면만 새로 만든다.
+        screen = self.screens.get(name)
+        if screen is None:
+            screen = self.frame_class(self.root)
+            self.builders[name](screen)
+            self.screens[name] = screen
+        if self.current != name:
+            self.hide()
+            screen.pack(fill="both", expand=True)
+            self.current = name
+        return screen
+
+    def hide(self):
+        if self.current is not None:
+            self.screens[self.current].pack_forget()
+            self.current = None
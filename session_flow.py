@@ -0,0 +1,180 @@
+# 설문 흐름 엔진 : 질문 표시 -> 선택 -> 학년/성별 입력 -> 집계 -> 통계 표시 흐름을 화면과 분리한 순수 파이썬 코어.
+# 화면은 SessionView 인터페이스만 구현하면 되고(옵저버 패턴), tkinter는 GUI 쪽 화면만 불러온다.
+# 서버, 일괄 작업, 테스트는 HeadlessView로 같은 흐름을 창 없이 돌린다.
+#
+# 사용 예 : python session_flow.py --sessions 100000   (스크립트로 만든 세션을 창 없이 재생해 처리량을 잰다)
+import abc
+import argparse
+import random
+import time
+
+from data_collector import CountingDataCollector, GRADES, GENDERS
+from data_cube import DataCube
+from pattern_index import PatternIndex
+from question_bank import shared_bank
+from response_log import ResponseLog, DEFAULT_LOG_PATH
+from snapshot import SnapshotStore, DEFAULT_SNAPSHOT_PATH, restore
+from sqlite_collector import SQLiteDataCollector
+from trend_window import TrendCounter
+
+FLUSH_INTERVAL_MS = 1000 # GUI가 flush_due를 부르는 간격(ms), 조용한 키오스크에서도 기록이 이 시간 안에 디스크에 닿는다.
+
+
+class SessionView(abc.ABC): # 흐름 엔진이 화면에 알리는 시점
+    @abc.abstractmethod
+    def show_question(self, index, question):
+        pass
+
+    @abc.abstractmethod
+    def ask_grade(self):
+        pass
+
+    @abc.abstractmethod
+    def ask_gender(self):
+        pass
+
+    @abc.abstractmethod
+    def show_statistics(self):
+        pass
+
+
+class HeadlessView(SessionView): # 아무것도 그리지 않는 화면
+    def show_question(self, index, question):
+        pass
+
+    def ask_grade(self):
+        pass
+
+    def ask_gender(self):
+        pass
+
+    def show_statistics(self):
+        pass
+
+
+class SessionFlow:
+    def __init__(self, view, collector, question_bank=None, response_log=None, snapshot_store=None, pattern_index=None, trend=None, cube=None):
+        self.view = view
+        self.question_bank = question_bank if question_bank is not None else shared_bank()
+        self.question_ids = self.question_bank.ids() # 표시 순서
+        self.collector = collector
+        self.response_log = response_log # None이면 기록하지 않는다. (SQLite 저장소나 메모리 전용)
+        self.snapshot_store = snapshot_store
+        self.pattern_index = pattern_index
+        self.trend = trend # 최근 구간 추세, 시각이 기록되지 않은 로그로는 복구할 수 없어 실행할 때부터 센다.
+        self.cube = cube # 학년 x 성별 조합 집계 ("3학년 여자" 같은 슬라이스)
+        self.current_question = 0
+        self.responses = []
+
+    def start_new_session(self):
+        self.current_question = 0
+        self.responses = []
+        self.display_question()
+
+    def display_question(self):
+        if self.current_question < len(self.question_ids):
+            self.view.show_question(self.current_question, self.question_bank.get(self.question_ids[self.current_question]))
+        else:
+            self.view.ask_grade()
+
+    def choose(self, option):
+        self.responses.append(option)
+        self.current_question += 1
+        self.display_question()
+
+    def undo(self): # 마지막 선택을 되돌린다. 되돌릴 선택이 없으면 False
+        if not self.responses:
+            return False
+        self.responses.pop()
+        self.current_question -= 1
+        self.display_question()
+        return True
+
+    def collect_gender(self):
+        self.view.ask_gender()
+
+    def update_statistics(self, grade, gender):
+        if self.response_log is not None: # 로그에 먼저 기록해, 기록에 실패한 제출이 집계에만 남지 않게 한다.
+            self.response_log.append(grade, gender, self.responses)
+        self.collector.update_statistics(grade, gender, self.responses)
+        if self.pattern_index is not None:
+            self.pattern_index.update_statistics(grade, gender, self.responses)
+        if self.trend is not None:
+            self.trend.update_statistics(grade, gender, self.responses)
+        if self.cube is not None:
+            self.cube.update_statistics(grade, gender, self.responses)
+        if self.response_log is not None: # 스냅샷은 이번 제출까지 반영한 집계와 보조 인덱스를 담는다.
+            self.snapshot_store.maybe_save(self.collector, self.response_log, self.snapshot_indexes())
+        self.view.show_statistics()
+
+    def snapshot_indexes(self): # 스냅샷 옆 파일에 함께 저장하는 보조 인덱스
+        indexes = {}
+        if self.pattern_index is not None:
+            indexes["patterns"] = self.pattern_index
+        if self.cube is not None:
+            indexes["cube"] = self.cube
+        return indexes
+
+    def flush_due(self): # 주기적으로 호출 : 다음 제출을 기다리지 않고 미뤄 둔 fsync나 SQLite 기록을 한다.
+        if self.response_log is not None:
+            self.response_log.sync_due()
+        elif hasattr(self.collector, "flush_due"):
+            self.collector.flush_due()
+
+    def close(self):
+        if self.response_log is not None:
+            self.response_log.close()
+            self.snapshot_store.save(self.collector, self.response_log, self.snapshot_indexes())
+        elif hasattr(self.collector, "close"):
+            self.collector.close()
+
+
+def open_flow(view, db_path=None, question_bank=None): # 키오스크 기본 저장소(로그 + 스냅샷, 또는 공유 SQLite)를 연결한 흐름
+    question_bank = question_bank if question_bank is not None else shared_bank()
+    question_ids = question_bank.ids()
+    if db_path is not None: # 여러 키오스크가 공유하는 SQLite 파일에 집계를 기록한다. 공유 DB에는 패턴, 학년 x 성별 조합, 시각 기록이 없다.
+        return SessionFlow(view, SQLiteDataCollector(question_ids, db_path), question_bank)
+    collector = CountingDataCollector(question_ids)
+    response_log = ResponseLog(DEFAULT_LOG_PATH)
+    snapshot_store = SnapshotStore(DEFAULT_SNAPSHOT_PATH)
+    pattern_index = PatternIndex(question_ids)
+    cube = DataCube(question_ids)
+    restore(collector, response_log, snapshot_store, {"patterns": pattern_index, "cube": cube}) # 최신 스냅샷(집계, 패턴, 큐브)을 읽고 그 이후의 로그만 재생
+    return SessionFlow(view, collector, question_bank, response_log, snapshot_store, pattern_index, TrendCounter(question_ids), cube)
+
+
+def run_sessions(flow, sessions): # (학년, 성별, 응답) 세션을 화면에서 누르는 것과 같은 순서로 재생한다.
+    count = 0
+    for grade, gender, responses in sessions:
+        flow.start_new_session()
+        for option in responses:
+            flow.choose(option)
+        flow.collect_gender()
+        flow.update_statistics(grade, gender)
+        count += 1
+    return count
+
+
+def scripted_sessions(count, n_questions, rng):
+    for _ in range(count):
+        yield rng.choice(GRADES), rng.choice(GENDERS), [rng.choice((1, 2)) for _ in range(n_questions)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="설문 흐름을 창 없이 재생합니다.")
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    question_bank = shared_bank()
+    question_ids = question_bank.ids()
+    flow = SessionFlow(HeadlessView(), CountingDataCollector(question_ids), question_bank, pattern_index=PatternIndex(question_ids))
+    sessions = list(scripted_sessions(args.sessions, len(question_ids), random.Random(args.seed)))
+    start = time.perf_counter()
+    count = run_sessions(flow, sessions)
+    elapsed = time.perf_counter() - start
+    print(f"{count} sessions in {elapsed:.2f}s ({count / elapsed:,.0f} sessions/s), {flow.collector.total_participants()} participants")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+# 유의성 검정 : 질문마다 학년별/성별 선택 분포가 다른지를 모든 질문에 대해 한 번에 검정한다.
+# 입력은 [수준, 질문, 선택지] 개수 텐서 하나이고, 카이제곱 통계량, 자유도, p값, Cramér's V, 윌슨 신뢰구간, Cohen's h를
+# 질문 축을 따라 NumPy 배열 연산으로 계산한다. (질문 수만큼 반복하지 않는다.)
+# 2x2 표(성별 x 두 선택지)에서 기대 빈도가 5보다 작은 칸이 있으면 카이제곱 근사 대신 Fisher 정확 검정의 p값을 쓴다.
+# 질문이 많을수록 우연히 유의하게 나오는 질문도 늘어나므로, 질문들에 걸쳐 Benjamini-Hochberg로 보정한 p값도 함께 낸다.
+import numpy as np
+
+from data_collector import GRADES, GENDERS
+
+Z_95 = 1.959963984540054 # 95% 신뢰구간의 z값
+ALPHA = 0.05
+
+# erfc 근사 계수 (Numerical Recipes erfcc, 상대 오차 1.2e-7 이하)
+ERFC_COEFFICIENTS = (-1.26551223, 1.00002368, 0.37409196, 0.09678418, -0.18628806, 0.27886807, -1.13520398, 1.48851587, -0.82215223, 0.17087277)
+
+
+def erfc(x): # x >= 0
+    t = 1.0 / (1.0 + 0.5 * x)
+    poly = np.zeros_like(t)
+    for coefficient in reversed(ERFC_COEFFICIENTS):
+        poly = poly * t + coefficient
+    return t * np.exp(-x * x + poly)
+
+
+def chi2_sf(statistic, dof): # 정수 자유도 카이제곱 분포의 위쪽 꼬리 확률, 자유도별 닫힌 식의 항을 한꺼번에 더한다.
+    statistic = np.asarray(statistic, dtype=np.float64)
+    dof = np.asarray(dof, dtype=np.int64)
+    half = statistic / 2
+    # 짝수 k : e^(-x/2) * sum_{0 <= i < k/2} (x/2)^i / i!
+    even_term = np.ones_like(statistic)
+    even_sum = np.where(dof >= 2, 1.0, 0.0)
+    # 홀수 k : erfc(sqrt(x/2)) + sqrt(2x/pi) * e^(-x/2) * sum_{1 <= i <= (k-1)/2} x^(i-1) / (1 * 3 * ... * (2i-1))
+    odd_term = np.ones_like(statistic)
+    odd_sum = np.where(dof >= 3, 1.0, 0.0)
+    for i in range(1, int(dof.max(initial=0)) // 2 + 1):
+        even_term = even_term * half / i
+        even_sum += np.where(i < dof // 2, even_term, 0.0)
+        odd_term = odd_term * statistic / (2 * i + 1)
+        odd_sum += np.where(i + 1 <= (dof - 1) // 2, odd_term, 0.0)
+    even = np.exp(-half) * even_sum
+    odd = erfc(np.sqrt(half)) + np.sqrt(2 * statistic / np.pi) * np.exp(-half) * odd_sum
+    p_value = np.where(dof % 2 == 0, even, odd)
+    return np.where(dof > 0, np.clip(p_value, 0.0, 1.0), 1.0)
+
+
+def log_factorials(n): # 0!..n!의 로그
+    return np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, n + 1, dtype=np.float64)))))
+
+
+def fisher_exact(tables): # [K, 2, 2] 표마다 양측 Fisher 정확 검정 p값, 가능한 표 전체를 한 격자에 놓고 확률을 더한다.
+    tables = np.asarray(tables, dtype=np.int64)
+    a = tables[:, 0, 0]
+    row1 = tables[:, 0].sum(axis=1)
+    col1 = tables[:, :, 0].sum(axis=1)
+    n = tables.sum(axis=(1, 2))
+    if len(n) == 0:
+        return np.zeros(0)
+    log_fact = log_factorials(int(n.max()))
+    low = np.maximum(0, row1 + col1 - n)
+    high = np.minimum(row1, col1)
+    grid = low[:, None] + np.arange(int((high - low).max()) + 1)
+    valid = grid <= high[:, None]
+    grid = np.minimum(grid, high[:, None])
+
+    def log_probability(x): # 주변합이 고정된 초기하분포에서 왼쪽 위 칸이 x일 확률의 로그
+        row1_, col1_, n_ = (value[:, None] if x.ndim == 2 else value for value in (row1, col1, n))
+        return (log_fact[col1_] - log_fact[x] - log_fact[col1_ - x] + log_fact[n_ - col1_] - log_fact[row1_ - x]
+                - log_fact[n_ - col1_ - row1_ + x] - log_fact[n_] + log_fact[row1_] + log_fact[n_ - row1_])
+
+    observed = log_probability(a)
+    probabilities = np.where(valid & (log_probability(grid) <= observed[:, None] + 1e-7), np.exp(log_probability(grid)), 0.0)
+    return np.minimum(probabilities.sum(axis=1), 1.0)
+
+
+def benjamini_hochberg(p_values): # 질문 축에 걸친 다중 비교 보정 p값 (FDR)
+    p_values = np.asarray(p_values, dtype=np.float64)
+    m = len(p_values)
+    if m == 0:
+        return p_values
+    order = np.argsort(p_values)
+    adjusted = p_values[order] * m / np.arange(1, m + 1)
+    adjusted = np.minimum.accumulate(adjusted[::-1])[::-1]
+    result = np.empty(m)
+    result[order] = np.minimum(adjusted, 1.0)
+    return result
+
+
+def wilson_interval(counts, totals, z=Z_95): # 선택 비율의 윌슨 신뢰구간, 응답이 없으면 (0, 0, 1)
+    counts = np.asarray(counts, dtype=np.float64)
+    totals = np.broadcast_to(np.asarray(totals, dtype=np.float64), counts.shape)
+    safe = np.maximum(totals, 1.0)
+    share = counts / safe
+    z2 = z * z
+    denominator = 1 + z2 / safe
+    center = (share + z2 / (2 * safe)) / denominator
+    half_width = z * np.sqrt(share * (1 - share) / safe + z2 / (4 * safe * safe)) / denominator
+    answered = totals > 0
+    return np.where(answered, share, 0.0), np.where(answered, center - half_width, 0.0), np.where(answered, center + half_width, 1.0)
+
+
+def cohens_h(share, other_share): # 두 비율의 차이 크기, |h| 0.2 작음 / 0.5 중간 / 0.8 큼
+    return 2 * np.arcsin(np.sqrt(share)) - 2 * np.arcsin(np.sqrt(other_share))
+
+
+class FactorTest: # 요인(학년 또는 성별) 하나에 대한 모든 질문의 검정 결과, 배열의 첫 축은 [질문] 또는 [수준, 질문, 선택지]
+    def __init__(self, name, levels, counts):
+        self.name = name
+        self.levels = list(levels)
+        self.counts = np.asarray(counts, dtype=np.int64) # [수준, 질문, 선택지]
+        table = self.counts.transpose(1, 0, 2).astype(np.float64) # [질문, 수준, 선택지] 분할표
+        level_totals = table.sum(axis=2)
+        choice_totals = table.sum(axis=1)
+        self.n = level_totals.sum(axis=1)
+        expected = level_totals[:, :, None] * choice_totals[:, None, :] / np.maximum(self.n, 1)[:, None, None]
+        cells = np.divide((table - expected) ** 2, expected, out=np.zeros_like(table), where=expected > 0)
+        self.statistic = cells.sum(axis=(1, 2))
+        # 응답이 없는 수준이나 아무도 고르지 않은 선택지는 표에서 빼고 자유도를 센다.
+        rows = (level_totals > 0).sum(axis=1)
+        columns = (choice_totals > 0).sum(axis=1)
+        self.dof = np.maximum((rows - 1) * (columns - 1), 0)
+        self.p_value = chi2_sf(self.statistic, self.dof)
+        self.test = np.full(len(self.n), "chi2", dtype=object)
+        if table.shape[1:] == (2, 2): # 기대 빈도가 작은 2x2 표는 카이제곱 근사가 부정확하므로 정확 검정
+            small = (self.dof > 0) & (expected < 5).any(axis=(1, 2))
+            if small.any():
+                self.p_value[small] = fisher_exact(table[small])
+                self.test[small] = "fisher"
+        self.adjusted_p = benjamini_hochberg(self.p_value)
+        smaller_side = np.minimum(rows, columns) - 1
+        self.cramers_v = np.sqrt(np.divide(self.statistic, self.n * smaller_side, out=np.zeros_like(self.statistic), where=self.n * smaller_side > 0))
+        # 수준별 선택 비율의 신뢰구간과, 그 수준을 뺀 나머지 참여자와 비교한 효과 크기 [수준, 질문, 선택지]
+        totals = self.counts.sum(axis=2, keepdims=True)
+        self.share, self.low, self.high = wilson_interval(self.counts, totals)
+        rest_counts = self.counts.sum(axis=0) - self.counts
+        rest_totals = rest_counts.sum(axis=2, keepdims=True)
+        rest_share = np.divide(rest_counts, rest_totals, out=np.zeros(rest_counts.shape), where=rest_totals > 0)
+        self.cohens_h = np.where((totals > 0) & (rest_totals > 0), cohens_h(self.share, rest_share), 0.0)
+
+    def significant(self, alpha=ALPHA): # 보정한 p값이 alpha보다 작은 질문 번호, 유의한 순서대로
+        order = np.argsort(self.adjusted_p, kind="stable")
+        return [int(i) for i in order if self.adjusted_p[i] < alpha]
+
+
+def collector_tables(collector): # 집계기 -> {요인 이름: (수준, [수준, 질문, 선택지] 개수)}
+    n_questions = len(collector.choices)
+    n_options = collector.n_options
+    counts = getattr(collector, "counts", None)
+    if counts is not None and len(counts) == len(collector.segments) * n_questions * n_options: # CountingDataCollector의 평탄화 배열
+        counts = np.frombuffer(counts, dtype=np.int64).copy()
+    else:
+        counts = np.array([collector.count(segment, i, option) for segment in collector.segments for i in range(n_questions) for option in range(1, n_options + 1)], dtype=np.int64)
+    counts = counts.reshape(len(collector.segments), n_questions, n_options)
+    index = {segment: i for i, segment in enumerate(collector.segments)}
+    return {
+        "학년": (GRADES, counts[[index[grade] for grade in GRADES]]),
+        "성별": (GENDERS, counts[[index[gender] for gender in GENDERS]]),
+    }
+
+
+class SignificanceReport: # 통계 화면에 붙이는 유의성 검정 요약, 집계가 바뀌었을 때만 다시 만든다.
+    def __init__(self, collector, question_name, limit=5, alpha=ALPHA):
+        self.collector = collector
+        self.question_name = question_name
+        self.limit = limit # 요인마다 보여 줄 질문 수
+        self.alpha = alpha
+        self.report_version = None
+        self.report = ""
+
+    def tests(self):
+        return [FactorTest(name, levels, counts) for name, (levels, counts) in collector_tables(self.collector).items()]
+
+    def render(self):
+        version = self.collector.version # 포맷하기 전에 읽어, 도중에 들어온 제출은 다음 호출에서 반영한다.
+        if self.report_version != version:
+            lines = [f"학년/성별에 따라 갈리는 질문 (BH 보정 p < {self.alpha}):\n"]
+            for test in self.tests():
+                significant = test.significant(self.alpha)
+                if not significant:
+                    lines.append(f"  {test.name}: 없음\n")
+                for i in significant[:self.limit]:
+                    # 선택 1 비율이 가장 높은 수준과 그 윌슨 95% 구간
+                    top = int(np.argmax(test.share[:, i, 0]))
+                    lines.append(
+                        f"  {test.name} {self.question_name(i)} [{test.test[i]}]: χ²={test.statistic[i]:.1f} df={test.dof[i]} "
+                        f"p={test.adjusted_p[i]:.2g} V={test.cramers_v[i]:.2f} | {test.levels[top]} 선택 1 "
+                        f"{test.share[top, i, 0] * 100:.0f}% [{test.low[top, i, 0] * 100:.0f}~{test.high[top, i, 0] * 100:.0f}]\n"
+                    )
+            self.report = "".join(lines)
+            self.report_version = version
+        return self.report
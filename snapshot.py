@@ -0,0 +1,99 @@
+# 스냅샷(체크포인트) : 집계된 개수와 그 시점의 로그 위치를 주기적으로 저장해, 시작할 때 로그 전체가 아닌 뒷부분만 재생하게 한다.
+#
+# 파일 구조 : MAGIC + 헤더(로그 위치, 세그먼트 수, 질문 수, 선택지 수) + totals 배열 + counts 배열 + crc32
+# 패턴 히스토그램, 데이터 큐브 같은 보조 인덱스는 같은 로그 위치로 옆 파일(.patterns, .cube)에 저장한다.
+# 보조 인덱스 파일 구조 : INDEX_MAGIC + 로그 위치 + index.to_bytes() + crc32
+import os
+import struct
+import zlib
+from array import array
+
+DEFAULT_SNAPSHOT_PATH = "balance_responses.snapshot"
+MAGIC = b"BGS1"
+HEADER = struct.Struct("<4sqIII")
+INDEX_MAGIC = b"BGP1"
+INDEX_HEADER = struct.Struct("<4sq")
+
+
+def write_atomic(path, body): # 임시 파일에 쓰고 교체해, 저장 중에 죽어도 이전 파일이 남게 한다.
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(body)
+        file.write(zlib.crc32(body).to_bytes(4, "little"))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+def read_checked(path): # crc32가 맞는 본문, 없거나 깨졌으면 None
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) < 4:
+        return None
+    body, checksum = data[:-4], data[-4:]
+    if zlib.crc32(body) != int.from_bytes(checksum, "little"):
+        return None
+    return body
+
+
+class SnapshotStore:
+    def __init__(self, path, every=1000):
+        self.path = path
+        self.every = every # 이 개수만큼 제출이 쌓이면 새 스냅샷을 저장
+        self.since_save = 0
+
+    def index_path(self, name): # 보조 인덱스 파일 경로 (예: balance_responses.snapshot.patterns)
+        return f"{self.path}.{name}"
+
+    def save(self, collector, response_log, indexes=None): # indexes : {이름: to_bytes/load_bytes/load_log가 있는 보조 인덱스}
+        response_log.sync() # 스냅샷이 가리키는 위치까지의 로그가 먼저 디스크에 있어야 한다.
+        body = HEADER.pack(MAGIC, response_log.end, len(collector.segments), collector.n_questions, collector.n_options)
+        write_atomic(self.path, body + collector.totals.tobytes() + collector.counts.tobytes())
+        for name, index in (indexes or {}).items():
+            write_atomic(self.index_path(name), INDEX_HEADER.pack(INDEX_MAGIC, response_log.end) + index.to_bytes())
+        self.since_save = 0
+
+    def maybe_save(self, collector, response_log, indexes=None): # 제출마다 호출하고, every개마다 한 번 실제로 저장한다.
+        self.since_save += 1
+        if self.since_save >= self.every:
+            self.save(collector, response_log, indexes)
+
+    def load(self, collector): # 스냅샷을 collector에 적용하고 로그 위치를 돌려준다. 쓸 수 없는 스냅샷이면 None.
+        body = read_checked(self.path)
+        if body is None or len(body) < HEADER.size:
+            return None
+        magic, offset, n_segments, n_questions, n_options = HEADER.unpack_from(body)
+        if magic != MAGIC or (n_segments, n_questions, n_options) != (len(collector.segments), collector.n_questions, collector.n_options):
+            return None # 질문이나 세그먼트 구성이 바뀌었으면 로그 전체를 다시 재생한다.
+        totals = array("q")
+        totals.frombytes(body[HEADER.size:HEADER.size + n_segments * totals.itemsize])
+        counts = array("q")
+        counts.frombytes(body[HEADER.size + n_segments * totals.itemsize:])
+        collector.load_counts(totals, counts)
+        return offset
+
+    def load_index(self, name, index, log_end): # 보조 인덱스를 불러오고 로그 위치를 돌려준다. 쓸 수 없거나 로그보다 앞서 있으면 None.
+        body = read_checked(self.index_path(name))
+        if body is None or len(body) < INDEX_HEADER.size:
+            return None
+        magic, offset = INDEX_HEADER.unpack_from(body)
+        if magic != INDEX_MAGIC or offset > log_end:
+            return None
+        if not index.load_bytes(body[INDEX_HEADER.size:]):
+            return None
+        return offset
+
+
+def restore(collector, response_log, snapshot_store, indexes=None): # 최신 스냅샷을 읽고 그 이후의 로그만 재생한다.
+    log_size = os.path.getsize(response_log.path) if os.path.exists(response_log.path) else 0
+    initial_counts = (array("q", collector.totals), array("q", collector.counts))
+    offset = snapshot_store.load(collector)
+    if offset is not None and offset > log_size: # 로그가 스냅샷보다 짧으면 스냅샷을 믿지 않는다.
+        collector.load_counts(*initial_counts)
+        offset = None
+    count = response_log.replay(collector) if offset is None else response_log.replay(collector, offset)
+    for name, index in (indexes or {}).items(): # 재생으로 잘린 꼬리가 정리된 뒤, 보조 인덱스도 저장된 위치 이후만 읽는다.
+        index.load_log(response_log, snapshot_store.load_index(name, index, response_log.end))
+    return count
@@ -0,0 +1,161 @@
+# SQLite 저장소 : 여러 키오스크 프로세스가 하나의 SQLite 파일(WAL 모드)에 집계를 함께 기록한다.
+# 제출 원본 행은 저장하지 않고, 세그먼트별 인원과 (세그먼트, 질문, 선택지)별 개수만 미리 집계된 표에 더한다.
+# 그래서 제출이 수백만 건이 되어도 표 크기는 세그먼트 x 질문 x 선택지로 고정되고, 조회는 기본 키 인덱스를 탄다.
+import sqlite3
+import threading
+import time
+from array import array
+from collections import Counter
+
+from data_collector import CountingDataCollector, SEGMENTS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segment_totals (
+    segment TEXT PRIMARY KEY,
+    total INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS option_counts (
+    segment TEXT NOT NULL,
+    question INTEGER NOT NULL,
+    option INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (segment, question, option)
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteDataCollector:
+    def __init__(self, choices, path, segments=SEGMENTS, n_options=2, batch_size=256, flush_interval=1.0):
+        self.cache = CountingDataCollector(choices, segments, n_options) # 마지막으로 읽은 DB 내용을 담는 메모리 집계기
+        self.choices = choices
+        self.segments = self.cache.segments
+        self.segment_index = self.cache.segment_index
+        self.n_questions = self.cache.n_questions
+        self.n_options = n_options
+        self.batch_size = batch_size # 이 개수만큼 모이면 한 트랜잭션으로 기록
+        self.flush_interval = flush_interval # 묶음이 덜 찼어도 첫 제출 후 이 시간(초)이 지나면 flush_due에서 기록
+        self.pending = [] # 아직 기록하지 않은 제출
+        self.pending_since = None
+        self.lock = threading.RLock() # 리포트 작업 스레드와 Tk 메인 스레드가 연결과 대기열을 함께 쓴다.
+        self.connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False) # 트랜잭션은 직접 연다.
+        self.connection.execute("PRAGMA journal_mode=WAL") # 읽기와 쓰기가 서로 막지 않게 한다.
+        self.connection.execute("PRAGMA synchronous=NORMAL") # WAL에서는 체크포인트 때만 fsync해도 안전하다.
+        self.connection.executescript(SCHEMA)
+        self.commits = 0 # 이 연결에서 커밋한 횟수 (data_version은 다른 연결의 변경만 반영한다)
+        self.loaded = None # 마지막으로 읽은 (data_version, commits)
+        self.db_totals = array("q", self.cache.totals) # 마지막으로 읽은 DB 내용
+        self.db_counts = array("q", self.cache.counts)
+        self.applied = None # 캐시에 반영한 (data_version, commits, 대기 중인 제출 수)
+
+    def update_statistics(self, grade, gender, responses):
+        self.cache.validate(grade, gender, responses)
+        with self.lock:
+            if not self.pending:
+                self.pending_since = time.monotonic()
+            self.pending.append((grade, gender, list(responses)))
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self): # 모아 둔 제출을 미리 집계한 뒤 UPSERT 한 트랜잭션으로 기록한다.
+        with self.lock:
+            if not self.pending:
+                return
+            totals = Counter()
+            counts = Counter()
+            for grade, gender, responses in self.pending:
+                for segment in (grade, gender):
+                    totals[segment] += 1
+                    for question, option in enumerate(responses):
+                        counts[segment, question, option] += 1
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                self.connection.executemany(
+                    "INSERT INTO segment_totals (segment, total) VALUES (?, ?) "
+                    "ON CONFLICT (segment) DO UPDATE SET total = total + excluded.total",
+                    totals.items())
+                self.connection.executemany(
+                    "INSERT INTO option_counts (segment, question, option, count) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (segment, question, option) DO UPDATE SET count = count + excluded.count",
+                    [(segment, question, option, count) for (segment, question, option), count in counts.items()])
+                self.connection.execute("COMMIT")
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.pending = []
+            self.commits += 1
+
+    def flush_due(self): # 타이머와 refresh에서 호출 : 덜 찬 묶음도 flush_interval 안에 기록해 다른 키오스크에 보이고 충돌에도 남게 한다.
+        with self.lock:
+            if self.pending and time.monotonic() - self.pending_since >= self.flush_interval:
+                self.flush()
+
+    def refresh(self):
+        # 리포트를 만들기 전에 한 번 호출한다. 다른 프로세스나 이 연결이 커밋했을 때만 표를 다시 읽고,
+        # 아직 기록하지 않은 이 키오스크의 제출을 더해 캐시를 만든다. 읽기 메서드는 캐시만 본다.
+        with self.lock:
+            self.flush_due()
+            key = (self.connection.execute("PRAGMA data_version").fetchone()[0], self.commits)
+            if key != self.loaded:
+                self.load_tables()
+                self.loaded = key
+            applied = key + (len(self.pending),)
+            if applied == self.applied:
+                return
+            cache = self.cache
+            totals = array("q", self.db_totals)
+            counts = array("q", self.db_counts)
+            for grade, gender, responses in self.pending:
+                for segment in (grade, gender):
+                    index = cache.segment_index[segment]
+                    totals[index] += 1
+                    base = index * cache.stride
+                    for question, option in enumerate(responses):
+                        counts[base + question * cache.n_options + option - 1] += 1
+            changed = False
+            for index in range(len(cache.segments)): # 값이 바뀐 세그먼트의 버전만 올려 리포트 캐시가 그 부분만 다시 그리게 한다.
+                start = index * cache.stride
+                if totals[index] != cache.totals[index] or counts[start:start + cache.stride] != cache.counts[start:start + cache.stride]:
+                    cache.segment_versions[index] += 1
+                    changed = True
+            if changed:
+                cache.totals = totals
+                cache.counts = counts
+                cache.version += 1
+            self.applied = applied
+
+    def load_tables(self):
+        cache = self.cache
+        totals = array("q", [0]) * len(cache.totals)
+        counts = array("q", [0]) * len(cache.counts)
+        for segment, total in self.connection.execute("SELECT segment, total FROM segment_totals"):
+            if segment in cache.segment_index:
+                totals[cache.segment_index[segment]] = total
+        for segment, question, option, count in self.connection.execute("SELECT segment, question, option, count FROM option_counts"):
+            if segment in cache.segment_index and question < cache.n_questions and 1 <= option <= cache.n_options:
+                counts[cache.segment_index[segment] * cache.stride + question * cache.n_options + option - 1] = count
+        self.db_totals = totals
+        self.db_counts = counts
+
+    @property
+    def version(self):
+        return self.cache.version
+
+    def segment_version(self, segment):
+        return self.cache.segment_version(segment)
+
+    def total(self, segment):
+        return self.cache.total(segment)
+
+    def count(self, segment, question, option):
+        return self.cache.count(segment, question, option)
+
+    def percent(self, segment, question, option):
+        return self.cache.percent(segment, question, option)
+
+    def total_participants(self):
+        return self.cache.total_participants()
+
+    def close(self):
+        with self.lock:
+            self.flush()
+            self.connection.close()
@@ -0,0 +1,132 @@
+# 가상화된 통계 보기 : 행 전체를 라벨 하나에 넣지 않고, 화면 높이만큼의 행 위젯만 만들어 스크롤할 때 내용만 바꿔 끼운다.
+# 그래서 그리기와 스크롤 비용은 보고서 크기가 아니라 보이는 영역의 높이에 비례한다.
+# 행 : (세그먼트, 질문 인덱스, 세그먼트 인원, 선택 1 비율, 선택 2 비율) (report_cache.ReportRows가 만든다.)
+import tkinter as tk
+from tkinter import ttk
+
+ALL_SEGMENTS = "전체"
+ALL_PERIODS = "전체 기간"
+SORT_KEYS = { # 정렬 이름 -> 행 정렬 키 (None이면 세그먼트 순서 그대로)
+    "세그먼트 순": None,
+    "질문 순": lambda row: row[1],
+    "선택 1 높은 순": lambda row: -row[3],
+    "선택 2 높은 순": lambda row: -row[4],
+}
+
+
+def select_rows(rows, segment=ALL_SEGMENTS, query="", sort="세그먼트 순", question_name=None):
+    # 세그먼트와 질문 검색어로 거르고 정렬한다. 검색어는 질문 번호나 질문 이름의 일부와 비교한다.
+    if segment != ALL_SEGMENTS:
+        rows = [row for row in rows if row[0] == segment]
+    query = query.strip()
+    if query:
+        matches = {} # 질문 인덱스 -> 일치 여부, 질문마다 한 번만 비교한다.
+        for row in rows:
+            i = row[1]
+            if i not in matches:
+                matches[i] = query == str(i + 1) or (question_name is not None and query in question_name(i))
+        rows = [row for row in rows if matches[row[1]]]
+    key = SORT_KEYS[sort]
+    if key is not None:
+        rows = sorted(rows, key=key) # 안정 정렬이라 같은 값끼리는 세그먼트 순서가 유지된다.
+    return rows
+
+
+class VirtualStatsView:
+    def __init__(self, parent, segments, question_name, periods=None, row_height=24, font=("Helvetica", 12)):
+        self.question_name = question_name # 질문 인덱스 -> 표시 이름
+        self.row_height = row_height
+        self.font = font
+        self.rows_by_period = {} # 기간 이름 -> 행 (전체 기간은 ReportRows, 최근 구간은 TrendCounter가 만든다.)
+        self.visible_rows = [] # 거르고 정렬한 행
+        self.offset = 0 # 맨 위에 보이는 행 번호
+        self.pool = [] # 재사용하는 행 라벨, 보이는 영역 높이만큼만 만든다.
+        self.height = 0
+
+        self.frame = tk.Frame(parent)
+        controls = tk.Frame(self.frame)
+        controls.pack(side=tk.TOP, fill=tk.X)
+        self.period_var = tk.StringVar(value=ALL_PERIODS)
+        if periods: # 기간을 고를 수 있을 때만 선택 상자를 둔다.
+            period_box = ttk.Combobox(controls, textvariable=self.period_var, values=list(periods), state="readonly", width=10)
+            period_box.pack(side=tk.LEFT, padx=5)
+            period_box.bind("<<ComboboxSelected>>", lambda e: self.refilter())
+        self.segment_var = tk.StringVar(value=ALL_SEGMENTS)
+        segment_box = ttk.Combobox(controls, textvariable=self.segment_var, values=[ALL_SEGMENTS] + list(segments), state="readonly", width=8)
+        segment_box.pack(side=tk.LEFT, padx=5)
+        segment_box.bind("<<ComboboxSelected>>", lambda e: self.refilter())
+        self.sort_var = tk.StringVar(value="세그먼트 순")
+        sort_box = ttk.Combobox(controls, textvariable=self.sort_var, values=list(SORT_KEYS), state="readonly", width=12)
+        sort_box.pack(side=tk.LEFT, padx=5)
+        sort_box.bind("<<ComboboxSelected>>", lambda e: self.refilter())
+        self.query_var = tk.StringVar(value="")
+        query_entry = tk.Entry(controls, textvariable=self.query_var)
+        query_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        query_entry.bind("<Return>", lambda e: self.refilter())
+
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.body = tk.Frame(self.frame)
+        self.body.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.body.bind("<Configure>", self.on_configure)
+        self.bind_wheel(self.body)
+
+    def pack(self, **options):
+        self.frame.pack(**options)
+
+    def bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1)) # Windows, macOS
+        widget.bind("<Button-4>", lambda e: self.scroll(-1)) # X11
+        widget.bind("<Button-5>", lambda e: self.scroll(1))
+
+    def on_configure(self, event): # 보이는 영역 높이가 바뀌면 행 라벨 수만 맞춘다.
+        self.height = event.height
+        needed = event.height // self.row_height + 1
+        while len(self.pool) < needed:
+            label = tk.Label(self.body, font=self.font, anchor="w", justify=tk.LEFT)
+            label.place(x=0, y=len(self.pool) * self.row_height, relwidth=1, height=self.row_height)
+            self.bind_wheel(label)
+            self.pool.append(label)
+        self.scroll_to(self.offset)
+
+    def page_size(self): # 온전히 보이는 행 수
+        return max(self.height // self.row_height, 1)
+
+    def set_rows(self, rows): # 전체 기간 행만 있을 때
+        self.set_period_rows({ALL_PERIODS: rows})
+
+    def set_period_rows(self, rows_by_period): # 새 집계 행을 받으면 현재 조건으로 다시 거른다. 스크롤 위치는 유지한다.
+        self.rows_by_period = rows_by_period
+        self.refilter(keep_offset=True)
+
+    def refilter(self, keep_offset=False):
+        rows = self.rows_by_period.get(self.period_var.get(), [])
+        self.visible_rows = select_rows(rows, self.segment_var.get(), self.query_var.get(), self.sort_var.get(), self.question_name)
+        self.scroll_to(self.offset if keep_offset else 0)
+
+    def yview(self, *args): # 스크롤바 명령 : ("moveto", 비율) 또는 ("scroll", n, "units"|"pages")
+        if args[0] == "moveto":
+            self.scroll_to(round(float(args[1]) * len(self.visible_rows)))
+        elif args[0] == "scroll":
+            self.scroll(int(args[1]) * (self.page_size() if args[2] == "pages" else 1))
+
+    def scroll(self, rows):
+        self.scroll_to(self.offset + rows)
+
+    def scroll_to(self, offset):
+        self.offset = max(0, min(offset, len(self.visible_rows) - self.page_size()))
+        self.redraw()
+
+    def redraw(self): # 보이는 행 라벨의 텍스트만 바꾼다.
+        rows = self.visible_rows
+        for k, label in enumerate(self.pool):
+            index = self.offset + k
+            label.config(text=self.format_row(rows[index]) if index < len(rows) else "")
+        if rows:
+            self.scrollbar.set(self.offset / len(rows), min((self.offset + self.page_size()) / len(rows), 1.0))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def format_row(self, row):
+        segment, i, total, percent1, percent2 = row
+        return f"{segment} ({total}명) | {self.question_name(i)} | 선택 1 - {percent1:.2f}%, 선택 2 - {percent2:.2f}%"
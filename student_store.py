@@ -0,0 +1,115 @@
+# 압축 학생 저장소 : 학생 한 명을 인구통계 1바이트(성별 코드 << 4 | 학년 코드)와 응답 비트열로 저장한다.
+# 응답은 질문마다 2비트가 아니라 "응답함" 비트열과 "선택 2" 비트열 두 개로 나눠, 질문 8개당 2바이트만 쓴다.
+# 세그먼트별 질문 개수는 학생을 하나씩 돌지 않고 NumPy 비트 연산(unpackbits)과 합계로 한 번에 구한다.
+import numpy as np
+
+from columnar_statistics import GENDERS, GRADES
+from project1 import QuestionFactory, Statistics, Student, StudentStrategyFactory
+
+CHUNK_ROWS = 1 << 16 # 비트를 풀 때 한 번에 다루는 행 수, 임시 메모리를 일정하게 유지한다.
+
+
+class StudentStore:
+    def __init__(self, question_ids=None, capacity=1024):
+        self.question_ids = list(QuestionFactory.question_ids() if question_ids is None else question_ids)
+        self.question_index = {question_id: i for i, question_id in enumerate(self.question_ids)}
+        self.row_bytes = (len(self.question_ids) + 7) // 8
+        self.gender_index = {gender: i for i, gender in enumerate(GENDERS)}
+        self.grade_index = {grade: i for i, grade in enumerate(GRADES)}
+        self.size = 0
+        self.demographics = np.zeros(capacity, dtype=np.uint8)
+        self.answered = np.zeros((capacity, self.row_bytes), dtype=np.uint8) # 응답한 질문이면 1
+        self.answers = np.zeros((capacity, self.row_bytes), dtype=np.uint8) # 선택 2이면 1
+
+    def reserve(self, count): # 용량이 모자라면 두 배씩 늘린다.
+        capacity = len(self.demographics)
+        if self.size + count <= capacity:
+            return
+        capacity = max(capacity, 1) # 용량 0에서 시작해도 두 배로 늘어나게 한다.
+        while capacity < self.size + count:
+            capacity *= 2
+        self.demographics = np.resize(self.demographics, capacity)
+        self.answered = np.resize(self.answered, (capacity, self.row_bytes))
+        self.answers = np.resize(self.answers, (capacity, self.row_bytes))
+
+    def add_students(self, students):
+        demographics = bytearray()
+        answered = bytearray()
+        answers = bytearray()
+        for student in students:
+            demographics.append(self.gender_index[student.gender] << 4 | self.grade_index[student.grade])
+            mask = 0
+            bits = 0
+            for question_id, choice in student.choices.items():
+                bit = 1 << self.question_index[question_id]
+                mask |= bit
+                if choice == "2":
+                    bits |= bit
+                elif choice != "1":
+                    raise ValueError(f"Unknown choice: {choice}")
+            answered += mask.to_bytes(self.row_bytes, "little")
+            answers += bits.to_bytes(self.row_bytes, "little")
+        count = len(demographics)
+        self.reserve(count)
+        end = self.size + count
+        self.demographics[self.size:end] = np.frombuffer(demographics, dtype=np.uint8)
+        self.answered[self.size:end] = np.frombuffer(answered, dtype=np.uint8).reshape(count, self.row_bytes)
+        self.answers[self.size:end] = np.frombuffer(answers, dtype=np.uint8).reshape(count, self.row_bytes)
+        self.size = end
+
+    def add(self, student):
+        self.add_students([student])
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self): # 실제로 쓰고 있는 바이트 수
+        return self.size * (1 + 2 * self.row_bytes)
+
+    def student(self, index): # 저장된 행을 Student 객체로 되돌린다.
+        demographic = int(self.demographics[index])
+        strategy = StudentStrategyFactory.strategies[GENDERS[demographic >> 4], GRADES[demographic & 0x0F]]
+        student = Student(strategy)
+        answered = int.from_bytes(self.answered[index].tobytes(), "little")
+        answers = int.from_bytes(self.answers[index].tobytes(), "little")
+        for position, question_id in enumerate(self.question_ids):
+            if answered >> position & 1:
+                student.make_choice(question_id, "2" if answers >> position & 1 else "1")
+        return student
+
+    def rows(self, gender=None, grade=None): # 조건에 맞는 행의 불리언 마스크, 조건이 없으면 None
+        demographics = self.demographics[:self.size]
+        mask = None
+        if gender is not None:
+            mask = (demographics >> 4) == self.gender_index[gender]
+        if grade is not None:
+            grade_mask = (demographics & 0x0F) == self.grade_index[grade]
+            mask = grade_mask if mask is None else mask & grade_mask
+        return mask
+
+    def counts(self, gender=None, grade=None): # [질문, 선택지] 개수, 지정하지 않은 축은 모두 합친다.
+        mask = self.rows(gender, grade)
+        n_questions = len(self.question_ids)
+        answered_total = np.zeros(n_questions, dtype=np.int64)
+        option2_total = np.zeros(n_questions, dtype=np.int64)
+        for start in range(0, self.size, CHUNK_ROWS):
+            end = min(start + CHUNK_ROWS, self.size)
+            answered = self.answered[start:end]
+            answers = self.answers[start:end]
+            if mask is not None:
+                answered = answered[mask[start:end]]
+                answers = answers[mask[start:end]]
+            answered_total += np.unpackbits(answered, axis=1, bitorder="little")[:, :n_questions].sum(axis=0, dtype=np.int64)
+            option2_total += np.unpackbits(answers, axis=1, bitorder="little")[:, :n_questions].sum(axis=0, dtype=np.int64)
+        return np.stack([answered_total - option2_total, option2_total], axis=1)
+
+    def to_statistics(self): # 저장된 학생 전체를 project1의 Statistics로 집계한다.
+        stats = Statistics()
+        table = stats.table
+        question_codes = [table.question_code(question_id) for question_id in self.question_ids]
+        choice_codes = [table.choice_code("1"), table.choice_code("2")]
+        for gender_code, gender in enumerate(GENDERS):
+            for grade_code, grade in enumerate(GRADES):
+                table.counts[gender_code, grade_code][np.ix_(question_codes, choice_codes)] += self.counts(gender, grade)
+        return stats
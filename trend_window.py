@@ -0,0 +1,90 @@
+# 구간 추세 통계 : 최근 N분 동안의 세그먼트/질문/선택지별 개수를 시간 버킷 링 버퍼에 나눠 센다.
+# 버킷 하나는 bucket_seconds 동안의 [세그먼트 인원 + 세그먼트 x 질문 x 선택지 개수]이고, n_buckets개를 돌려 쓴다.
+# 버킷마다 어느 시간 구간을 담고 있는지 기록해 두고, 오래된 버킷은 다시 쓸 때 비우므로 메모리는 실행 시간과 상관없이 고정된다.
+# 구간 질의는 구간에 걸친 버킷만 더하므로 O(버킷 수)이다.
+import time
+from array import array
+
+from data_collector import SEGMENTS
+
+TREND_WINDOWS = {"최근 10분": 600, "최근 1시간": 3600} # 통계 화면에 보여 줄 구간 이름 -> 초
+TREND_REFRESH_MS = 10000 # 통계 화면을 보는 동안 구간을 다시 계산하는 간격, 버킷(60초)보다 짧아야 지난 버킷이 제때 빠진다.
+
+
+class TrendCounter:
+    def __init__(self, choices, segments=SEGMENTS, n_options=2, bucket_seconds=60, n_buckets=60, clock=time.time):
+        self.choices = choices
+        self.segments = list(segments)
+        self.segment_index = {segment: i for i, segment in enumerate(self.segments)}
+        self.n_questions = len(choices)
+        self.n_options = n_options
+        self.stride = self.n_questions * n_options # 세그먼트 하나가 차지하는 칸 수
+        self.width = len(self.segments) + len(self.segments) * self.stride # 버킷 하나 : 세그먼트 인원 + [세그먼트][질문][선택지] 개수
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = n_buckets # 가장 긴 구간 = bucket_seconds * n_buckets
+        self.clock = clock
+        self.data = array("q", [0]) * (n_buckets * self.width)
+        self.bucket_ids = array("q", [-1]) * n_buckets # 칸 -> 담고 있는 시간 구간 번호 (시각 // bucket_seconds)
+        self.version = 0
+
+    def slot(self, bucket_id): # 시간 구간의 칸 시작 위치, 다른(오래된) 구간이 들어 있으면 비우고 넘겨받는다.
+        index = bucket_id % self.n_buckets
+        base = index * self.width
+        if self.bucket_ids[index] != bucket_id:
+            self.data[base:base + self.width] = array("q", [0]) * self.width
+            self.bucket_ids[index] = bucket_id
+        return base
+
+    def update_statistics(self, grade, gender, responses, now=None): # CountingDataCollector와 같은 시그니처
+        if grade not in self.segment_index or gender not in self.segment_index:
+            raise ValueError("Unknown segment")
+        now = self.clock() if now is None else now
+        base = self.slot(int(now // self.bucket_seconds))
+        n_segments = len(self.segments)
+        for segment in (grade, gender):
+            index = self.segment_index[segment]
+            self.data[base + index] += 1
+            start = base + n_segments + index * self.stride
+            for i, response in enumerate(responses):
+                self.data[start + i * self.n_options + response - 1] += 1
+        self.version += 1
+
+    def window_slots(self, seconds, now=None): # 구간 안에 있는 아직 유효한 버킷의 시작 위치
+        now = self.clock() if now is None else now
+        current = int(now // self.bucket_seconds)
+        count = min(-(-int(seconds) // self.bucket_seconds), self.n_buckets) # 구간에 걸친 버킷 수 (올림)
+        for bucket_id in range(current - count + 1, current + 1):
+            index = bucket_id % self.n_buckets
+            if self.bucket_ids[index] == bucket_id:
+                yield index * self.width
+
+    def total(self, segment, seconds, now=None):
+        index = self.segment_index[segment]
+        return sum(self.data[base + index] for base in self.window_slots(seconds, now))
+
+    def count(self, segment, question, option, seconds, now=None): # question은 0부터, option은 1부터 센다.
+        offset = len(self.segments) + self.segment_index[segment] * self.stride + question * self.n_options + option - 1
+        return sum(self.data[base + offset] for base in self.window_slots(seconds, now))
+
+    def percent(self, segment, question, option, seconds, now=None):
+        total = self.total(segment, seconds, now)
+        if total == 0:
+            return 0.0
+        return self.count(segment, question, option, seconds, now) / total * 100
+
+    def rows(self, seconds, now=None): # 구간 합계를 한 번에 더해 ReportRows와 같은 모양의 행으로 돌려준다.
+        sums = array("q", [0]) * self.width
+        for base in self.window_slots(seconds, now):
+            for i in range(self.width):
+                sums[i] += self.data[base + i]
+        rows = []
+        n_segments = len(self.segments)
+        for index, segment in enumerate(self.segments):
+            total = sums[index]
+            if total == 0:
+                continue
+            start = n_segments + index * self.stride
+            for i in range(self.n_questions):
+                offset = start + i * self.n_options
+                rows.append((segment, i, total, sums[offset] / total * 100, sums[offset + 1] / total * 100))
+        return rows